@@ -3,20 +3,15 @@ Generate sample Excel report for demonstration purposes.
 Run this script to create the sample_report_contoso_20251204.xlsx file.
 """
 
-import pandas as pd
 from pathlib import Path
-from openpyxl import load_workbook
-from openpyxl.chart import PieChart, BarChart, Reference
-from openpyxl.chart.label import DataLabelList
-from openpyxl.chart.series import DataPoint
-from openpyxl.drawing.fill import PatternFillProperties, ColorChoice
+import xlsxwriter
 
 # Create output directory
 output_dir = Path(__file__).parent
 output_file = output_dir / "sample_report_contoso_20251204.xlsx"
 
 # Sample data for Executive Summary
-executive_summary = pd.DataFrame({
+executive_summary = {
     'Metric': [
         'Customer Name',
         'Report Period Start',
@@ -53,10 +48,10 @@ executive_summary = pd.DataFrame({
         78519.00,
         28000.00
     ]
-})
+}
 
 # Sample data for Savings by Service
-savings_by_service = pd.DataFrame({
+savings_by_service = {
     'ServiceCategory': [
         'Virtual Machines',
         'SQL Database',
@@ -81,10 +76,10 @@ savings_by_service = pd.DataFrame({
     'CommitmentSavings': [335500, 112400, 46800, 22450, 28400, 13499, 10200, 6500, 3600, 1800, 850, 880, 590, 280, 0],
     'TotalSavings': [460000, 158000, 78000, 42300, 44000, 25934, 20000, 13000, 6000, 3000, 1700, 1600, 1100, 600, 6000],
     'SavingsPercentage': [36.9, 34.6, 25.0, 21.3, 28.2, 20.9, 20.4, 20.0, 25.0, 25.0, 20.0, 22.2, 21.6, 18.8, 10.0]
-})
+}
 
 # Sample data for Savings by Subscription
-savings_by_subscription = pd.DataFrame({
+savings_by_subscription = {
     'SubAccountId': [
         'sub-001-prod',
         'sub-002-staging',
@@ -104,10 +99,10 @@ savings_by_subscription = pd.DataFrame({
     'CommitmentSavings': [425400, 72800, 47549, 30000],
     'TotalSavings': [611000, 114000, 72234, 50000],
     'SavingsPercentage': [32.9, 27.7, 29.3, 25.0]
-})
+}
 
 # Sample data for Monthly Trend
-monthly_trend = pd.DataFrame({
+monthly_trend = {
     'Month': ['2025-09', '2025-10', '2025-11'],
     'ListCost': [892450, 915200, 907200],
     'BilledCost': [803205, 823680, 816480],
@@ -116,10 +111,10 @@ monthly_trend = pd.DataFrame({
     'CommitmentSavings': [191205, 188064, 196480],
     'TotalSavings': [280450, 279584, 287200],
     'SavingsPercentage': [31.4, 30.5, 31.7]
-})
+}
 
 # Sample data for Top Resources
-top_resources = pd.DataFrame({
+top_resources = {
     'ResourceId': [
         '/subscriptions/sub-001/resourceGroups/rg-prod/providers/Microsoft.Sql/servers/prod-sql-primary',
         '/subscriptions/sub-001/resourceGroups/rg-prod/providers/Microsoft.ContainerService/managedClusters/prod-aks-cluster-01',
@@ -172,10 +167,10 @@ top_resources = pd.DataFrame({
     'EffectiveCost': [52400, 40300, 33300, 30000, 27150, 22800, 20400, 16000, 12200, 14800],
     'TotalSavings': [45600, 38200, 32100, 28900, 18450, 15200, 14800, 12600, 6300, 7600],
     'SavingsPercentage': [46.5, 48.7, 49.1, 49.1, 40.5, 40.0, 42.0, 44.1, 34.1, 33.9]
-})
+}
 
 # Sample data for Reserved Instances
-reserved_instances = pd.DataFrame({
+reserved_instances = {
     'ReservationId': ['ri-001', 'ri-002', 'ri-003', 'ri-004', 'ri-005'],
     'ReservationName': [
         'RI-Prod-VMs-EastUS',
@@ -198,10 +193,10 @@ reserved_instances = pd.DataFrame({
     'ListCost': [312000, 178900, 134000, 45000, 18500],
     'EffectiveCost': [156000, 89450, 67000, 24500, 12200],
     'Savings': [156000, 89450, 67000, 20500, 6300]
-})
+}
 
 # Sample data for Savings Plans
-savings_plans = pd.DataFrame({
+savings_plans = {
     'SavingsPlanId': ['sp-001', 'sp-002'],
     'SavingsPlanName': ['SP-Compute-3Year', 'SP-Compute-1Year'],
     'Term': ['3 Year', '1 Year'],
@@ -212,39 +207,45 @@ savings_plans = pd.DataFrame({
     'ListCostCovered': [245000, 142000],
     'EffectiveCost': [146220, 84000],
     'Savings': [98780, 58000]
-})
+}
 
 # Sample data for Azure Hybrid Benefit
-ahb_savings = pd.DataFrame({
+ahb_savings = {
     'LicenseType': ['Windows Server', 'SQL Server Standard', 'SQL Server Enterprise'],
     'ResourceCount': [45, 12, 5],
     'ListCost': [89500, 56000, 42000],
     'EffectiveCost': [45000, 35981, 28000],
     'Savings': [44500, 20019, 14000],
     'SavingsPercentage': ['49.7%', '35.7%', '33.3%']
-})
+}
 
-# Write to Excel with multiple sheets
-with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-    executive_summary.to_excel(writer, sheet_name='Executive Summary', index=False)
-    savings_by_service.to_excel(writer, sheet_name='By Service', index=False)
-    savings_by_subscription.to_excel(writer, sheet_name='By Subscription', index=False)
-    monthly_trend.to_excel(writer, sheet_name='Monthly Trend', index=False)
-    top_resources.to_excel(writer, sheet_name='Top Resources', index=False)
-    reserved_instances.to_excel(writer, sheet_name='Reserved Instances', index=False)
-    savings_plans.to_excel(writer, sheet_name='Savings Plans', index=False)
-    ahb_savings.to_excel(writer, sheet_name='Azure Hybrid Benefit', index=False)
 
-# Now add charts to the workbook
-wb = load_workbook(output_file)
+def write_sheet(wb, sheet_name, table):
+    """Write a column-name -> values table to a new sheet, header row first"""
+    ws = wb.add_worksheet(sheet_name)
+    ws.write_row(0, 0, list(table))
+    for r, row in enumerate(zip(*table.values()), start=1):
+        ws.write_row(r, 0, row)
+    return ws
 
-# Create Charts sheet
-charts_ws = wb.create_sheet('Charts', 0)  # Insert at the beginning
 
-# Add chart data for savings distribution pie chart
+# Build the workbook with xlsxwriter in constant_memory mode so rows are
+# flushed as they are written and the charts go in before a single close
+wb = xlsxwriter.Workbook(str(output_file), {'constant_memory': True})
+
+# Create Charts sheet first so it is the first tab in the workbook
+charts_ws = wb.add_worksheet('Charts')
+
+# constant_memory sheets are filled strictly top to bottom, so lay out the rows in order
+# (row numbers below are 1-based, as shown in Excel)
 chart_data_start_row = 20  # Place data below the charts
-charts_ws.cell(row=chart_data_start_row, column=1, value='Savings Category')
-charts_ws.cell(row=chart_data_start_row, column=2, value='Amount')
+trend_data_start_row = 30
+
+summary_text = [
+    "Total Savings: $847,234",
+    "Savings Rate: 31.2%",
+    "Report Period: Sep-Nov 2025"
+]
 
 savings_categories = [
     ('Negotiated Discount', 271485),
@@ -254,68 +255,72 @@ savings_categories = [
     ('Dev/Test Pricing', 28000)
 ]
 
-for i, (category, amount) in enumerate(savings_categories, start=1):
-    charts_ws.cell(row=chart_data_start_row + i, column=1, value=category)
-    charts_ws.cell(row=chart_data_start_row + i, column=2, value=amount)
-
-# Create Pie Chart for Savings Distribution
-pie = PieChart()
-pie.title = "Savings by Category"
-labels = Reference(charts_ws, min_col=1, min_row=chart_data_start_row + 1, max_row=chart_data_start_row + 5)
-data = Reference(charts_ws, min_col=2, min_row=chart_data_start_row, max_row=chart_data_start_row + 5)
-pie.add_data(data, titles_from_data=True)
-pie.set_categories(labels)
-pie.width = 15
-pie.height = 10
-
-# Add data labels to pie chart
-pie.dataLabels = DataLabelList()
-pie.dataLabels.showPercent = True
-pie.dataLabels.showCatName = True
-pie.dataLabels.showVal = False
-
-charts_ws.add_chart(pie, "A1")
-
-# Add monthly trend data for bar chart
-trend_data_start_row = 30
-charts_ws.cell(row=trend_data_start_row, column=1, value='Month')
-charts_ws.cell(row=trend_data_start_row, column=2, value='Savings ($)')
-
 monthly_savings = [
     ('Sep 2025', 267500),
     ('Oct 2025', 285000),
     ('Nov 2025', 294734)
 ]
 
-for i, (month, savings) in enumerate(monthly_savings, start=1):
-    charts_ws.cell(row=trend_data_start_row + i, column=1, value=month)
-    charts_ws.cell(row=trend_data_start_row + i, column=2, value=savings)
+# Add summary text in column T
+for i, text in enumerate(summary_text):
+    charts_ws.write(i, 19, text)
+
+# Add chart data for savings distribution pie chart
+charts_ws.write_row(chart_data_start_row - 1, 0, ['Savings Category', 'Amount'])
+for i, row in enumerate(savings_categories, start=chart_data_start_row):
+    charts_ws.write_row(i, 0, row)
+
+# Add monthly trend data for bar chart
+charts_ws.write_row(trend_data_start_row - 1, 0, ['Month', 'Savings ($)'])
+for i, row in enumerate(monthly_savings, start=trend_data_start_row):
+    charts_ws.write_row(i, 0, row)
+
+# Create Pie Chart for Savings Distribution
+pie = wb.add_chart({'type': 'pie'})
+pie.set_title({'name': "Savings by Category"})
+pie.add_series({
+    'name': ['Charts', chart_data_start_row - 1, 1],
+    'categories': ['Charts', chart_data_start_row, 0, chart_data_start_row + 4, 0],
+    'values': ['Charts', chart_data_start_row, 1, chart_data_start_row + 4, 1],
+    # Add data labels to pie chart
+    'data_labels': {'percentage': True, 'category': True, 'value': False},
+})
+pie.set_size({'width': 567, 'height': 378})  # 15cm x 10cm
+
+charts_ws.insert_chart("A1", pie)
 
 # Create Bar Chart for Monthly Trend
-bar = BarChart()
-bar.title = "Monthly Savings Trend"
-bar.type = "col"
-bar.style = 10
-bar.y_axis.title = "Savings ($)"
-bar.x_axis.title = "Month"
+bar = wb.add_chart({'type': 'column'})
+bar.set_title({'name': "Monthly Savings Trend"})
+bar.set_style(10)
+bar.set_y_axis({'name': "Savings ($)"})
+bar.set_x_axis({'name': "Month"})
+bar.add_series({
+    'name': ['Charts', trend_data_start_row - 1, 1],
+    'categories': ['Charts', trend_data_start_row, 0, trend_data_start_row + 2, 0],
+    'values': ['Charts', trend_data_start_row, 1, trend_data_start_row + 2, 1],
+})
+bar.set_size({'width': 567, 'height': 378})
 
-bar_data = Reference(charts_ws, min_col=2, min_row=trend_data_start_row, max_row=trend_data_start_row + 3)
-bar_cats = Reference(charts_ws, min_col=1, min_row=trend_data_start_row + 1, max_row=trend_data_start_row + 3)
-bar.add_data(bar_data, titles_from_data=True)
-bar.set_categories(bar_cats)
-bar.width = 15
-bar.height = 10
-bar.shape = 4
+charts_ws.insert_chart("J1", bar)
 
-charts_ws.add_chart(bar, "J1")
+# Stream each data sheet row by row
+sheets = [
+    (executive_summary, 'Executive Summary'),
+    (savings_by_service, 'By Service'),
+    (savings_by_subscription, 'By Subscription'),
+    (monthly_trend, 'Monthly Trend'),
+    (top_resources, 'Top Resources'),
+    (reserved_instances, 'Reserved Instances'),
+    (savings_plans, 'Savings Plans'),
+    (ahb_savings, 'Azure Hybrid Benefit'),
+]
 
-# Add summary text
-charts_ws.cell(row=1, column=20, value="Total Savings: $847,234")
-charts_ws.cell(row=2, column=20, value="Savings Rate: 31.2%")
-charts_ws.cell(row=3, column=20, value="Report Period: Sep-Nov 2025")
+for table, sheet_name in sheets:
+    write_sheet(wb, sheet_name, table)
 
 # Save the workbook with charts
-wb.save(output_file)
+wb.close()
 
 print(f"Sample Excel report generated: {output_file}")
 print("Charts sheet added with Pie Chart (Savings by Category) and Bar Chart (Monthly Trend)")
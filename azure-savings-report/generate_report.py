@@ -4,23 +4,20 @@ Azure Savings Report Generator
 Main entry point for generating customer savings reports
 """
 
+import copy
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 import typer
-import yaml
+from dateutil.relativedelta import relativedelta
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
 
-from src import (
-    create_data_source,
-    SavingsCalculator,
-    ReportGenerator,
-    ADXDataSource
-)
+# Heavier dependencies (yaml, rich.progress/table and the src package, which
+# pulls in pandas) are imported inside the commands that need them so that
+# `--help` and other light paths start quickly
 
 app = typer.Typer(
     name="azure-savings-report",
@@ -28,6 +25,22 @@ app = typer.Typer(
 )
 console = Console()
 
+# Listings longer than this are printed as plain text instead of a Rich Table
+TABLE_ROW_LIMIT = 100
+
+
+@lru_cache(maxsize=8)
+def _load_config_cached(config_path: str, mtime: float) -> dict:
+    """Parse a config file; cached per (absolute path, mtime) so edits are picked up"""
+    import yaml
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:  # PyYAML built without libyaml
+        from yaml import SafeLoader
+    
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
 
 def load_config(config_path: str = "config.yaml") -> dict:
     """Load configuration from YAML file"""
@@ -37,8 +50,21 @@ def load_config(config_path: str = "config.yaml") -> dict:
         console.print("Please copy config.example.yaml to config.yaml and configure your settings.")
         raise typer.Exit(1)
     
-    with open(config_file, 'r') as f:
-        return yaml.safe_load(f)
+    config_file = config_file.resolve()
+    config = _load_config_cached(str(config_file), config_file.stat().st_mtime)
+    
+    # Commands override settings in place, so never hand out the cached dict
+    return copy.deepcopy(config)
+
+
+def report_window(months: int, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Date range for the last N calendar months, counting the current month"""
+    # Snap the start to the first of the month so queries land on month
+    # boundaries instead of drifting by months * 30 days
+    end_date = now or datetime.now()
+    month_start = end_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    start_date = month_start - relativedelta(months=max(months, 1) - 1)
+    return start_date, end_date
 
 
 @app.command()
@@ -47,161 +73,173 @@ def generate(
     months: int = typer.Option(3, "--months", "-m", help="Number of months to analyze"),
     output_dir: Optional[str] = typer.Option(None, "--output", "-o", help="Output directory for reports"),
     config_path: str = typer.Option("config.yaml", "--config", help="Path to config file"),
-    format: str = typer.Option("all", "--format", "-f", help="Output format: html, excel, or all")
+    format: str = typer.Option("all", "--format", "-f", help="Output format: html, excel, or all"),
+    use_cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cost data cached on disk in the last 24 hours")
 ):
     """Generate a savings report for a customer"""
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.table import Table
+    
+    from src import get_data_source, config_hash, cached_get_costs, COST_COLUMNS, SavingsCalculator, ReportGenerator
     
     console.print("[bold blue]Azure Savings Realization Report Generator[/bold blue]")
     console.print("=" * 50)
     
-    # Load configuration
+    # A single live display covers every step; each step adds a task and
+    # removes it when done so only the current step's spinner is shown
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
+        console=console,
         transient=True,
     ) as progress:
-        progress.add_task(description="Loading configuration...", total=None)
+        # Load configuration
+        task = progress.add_task(description="Loading configuration...", total=None)
         config = load_config(config_path)
-    
-    # Override config with CLI options
-    if customer:
-        config['report']['customer_name'] = customer
-    if output_dir:
-        config['report']['output_dir'] = output_dir
-    if months:
-        config['report']['months'] = months
-    
-    customer_name = config['report']['customer_name']
-    output_directory = config['report']['output_dir']
-    currency = config['report'].get('currency', 'USD')
-    
-    console.print(f"\n[green]Customer:[/green] {customer_name}")
-    console.print(f"[green]Period:[/green] Last {months} months")
-    console.print(f"[green]Output:[/green] {output_directory}")
-    
-    # Calculate date range
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=months * 30)
-    
-    # Connect to data source
-    console.print("\n[bold]Connecting to data source...[/bold]")
-    
-    try:
-        data_source = create_data_source(config)
+        progress.remove_task(task)
+        
+        # Override config with CLI options
+        if customer:
+            config['report']['customer_name'] = customer
+        if output_dir:
+            config['report']['output_dir'] = output_dir
+        if months:
+            config['report']['months'] = months
         
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
+        customer_name = config['report']['customer_name']
+        output_directory = config['report']['output_dir']
+        currency = config['report'].get('currency', 'USD')
+        
+        console.print(f"\n[green]Customer:[/green] {customer_name}")
+        console.print(f"[green]Period:[/green] Last {months} months")
+        console.print(f"[green]Output:[/green] {output_directory}")
+        
+        # Calculate date range
+        start_date, end_date = report_window(months)
+        
+        # Connect to data source
+        console.print("\n[bold]Connecting to data source...[/bold]")
+        
+        try:
+            data_source = get_data_source(config)
+            
             task = progress.add_task(description="Testing connection...", total=None)
             
             if not data_source.test_connection():
                 console.print("[red]Failed to connect to data source[/red]")
                 raise typer.Exit(1)
             
-            progress.update(task, description="Connection successful!")
+            progress.remove_task(task)
+            
+            console.print("[green]✓[/green] Connected to data source")
+            
+        except Exception as e:
+            console.print(f"[red]Error connecting to data source: {e}[/red]")
+            raise typer.Exit(1)
         
-        console.print("[green]✓[/green] Connected to data source")
+        # Fetch cost data
+        console.print("\n[bold]Fetching cost data...[/bold]")
         
-    except Exception as e:
-        console.print(f"[red]Error connecting to data source: {e}[/red]")
-        raise typer.Exit(1)
-    
-    # Fetch cost data
-    console.print("\n[bold]Fetching cost data...[/bold]")
-    
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        transient=True,
-    ) as progress:
         task = progress.add_task(description="Querying costs...", total=None)
         
         try:
-            costs_df = data_source.get_costs(start_date, end_date)
-            progress.update(task, description=f"Retrieved {len(costs_df):,} cost records")
+            # The calculator reads only the FOCUS columns, so storage exports
+            # are not loaded in full
+            if use_cache:
+                costs_df = cached_get_costs(data_source, start_date, end_date, config_hash(config), columns=COST_COLUMNS)
+            else:
+                costs_df = data_source.get_costs(start_date, end_date, COST_COLUMNS)
         except Exception as e:
             console.print(f"[red]Error fetching costs: {e}[/red]")
             raise typer.Exit(1)
-    
-    if costs_df.empty:
-        console.print("[yellow]Warning: No cost data found for the specified period[/yellow]")
-        raise typer.Exit(1)
-    
-    console.print(f"[green]✓[/green] Retrieved {len(costs_df):,} cost records")
-    
-    # Fetch price data if available
-    prices_df = None
-    try:
-        prices_df = data_source.get_prices()
-        if not prices_df.empty:
-            console.print(f"[green]✓[/green] Retrieved {len(prices_df):,} price records")
-    except Exception:
-        console.print("[yellow]Note: Price sheet data not available[/yellow]")
-    
-    # Calculate savings
-    console.print("\n[bold]Calculating savings...[/bold]")
-    
-    calculator = SavingsCalculator(costs_df, prices_df)
-    
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        transient=True,
-    ) as progress:
+        
+        progress.remove_task(task)
+        
+        if costs_df.empty:
+            console.print("[yellow]Warning: No cost data found for the specified period[/yellow]")
+            raise typer.Exit(1)
+        
+        console.print(f"[green]✓[/green] Retrieved {len(costs_df):,} cost records")
+        
+        # Fetch price data if available
+        prices_df = None
+        try:
+            prices_df = data_source.get_prices(start_date, end_date)
+            if not prices_df.empty:
+                console.print(f"[green]✓[/green] Retrieved {len(prices_df):,} price records")
+        except Exception:
+            console.print("[yellow]Note: Price sheet data not available[/yellow]")
+        
+        # Calculate savings
+        console.print("\n[bold]Calculating savings...[/bold]")
+        
+        calculator = SavingsCalculator(costs_df, prices_df)
+        
         task = progress.add_task(description="Generating report...", total=None)
         report = calculator.generate_report(customer_name, start_date, end_date, currency)
-    
-    # Display summary
-    console.print("\n[bold]Savings Summary[/bold]")
-    
-    summary_table = Table(show_header=True, header_style="bold blue")
-    summary_table.add_column("Category", style="cyan")
-    summary_table.add_column("Savings", justify="right", style="green")
-    summary_table.add_column("% of Total", justify="right")
-    
-    categories = [
-        ("Negotiated Discount", report.negotiated_discount_savings),
-        ("Reserved Instances", report.reserved_instance_savings),
-        ("Savings Plans", report.savings_plan_savings),
-        ("Azure Hybrid Benefit", report.ahb_savings),
-        ("Dev/Test Pricing", report.devtest_savings),
-    ]
-    
-    for name, savings in categories:
-        if savings.total_savings > 0:
-            pct = (savings.total_savings / report.total_savings * 100) if report.total_savings > 0 else 0
-            summary_table.add_row(
-                name,
-                f"${savings.total_savings:,.2f}",
-                f"{pct:.1f}%"
-            )
-    
-    summary_table.add_row("", "", "", style="dim")
-    summary_table.add_row(
-        "[bold]TOTAL SAVINGS[/bold]",
-        f"[bold green]${report.total_savings:,.2f}[/bold green]",
-        f"[bold]{report.total_savings_percentage:.1f}%[/bold]"
-    )
-    
-    console.print(summary_table)
-    
-    # Generate reports
-    console.print("\n[bold]Generating reports...[/bold]")
-    
-    generator = ReportGenerator(output_directory)
-    generated_files = []
-    
-    if format in ('html', 'all'):
-        html_path = generator.generate_html_report(report)
-        generated_files.append(('HTML', html_path))
-        console.print(f"[green]✓[/green] HTML report: {html_path}")
-    
-    if format in ('excel', 'all'):
-        excel_path = generator.generate_excel_report(report)
-        generated_files.append(('Excel', excel_path))
-        console.print(f"[green]✓[/green] Excel report: {excel_path}")
+        progress.remove_task(task)
+        
+        # Display summary
+        console.print("\n[bold]Savings Summary[/bold]")
+        
+        summary_table = Table(show_header=True, header_style="bold blue")
+        summary_table.add_column("Category", style="cyan")
+        summary_table.add_column("Savings", justify="right", style="green")
+        summary_table.add_column("% of Total", justify="right")
+        
+        categories = [
+            ("Negotiated Discount", report.negotiated_discount_savings),
+            ("Reserved Instances", report.reserved_instance_savings),
+            ("Savings Plans", report.savings_plan_savings),
+            ("Azure Hybrid Benefit", report.ahb_savings),
+            ("Dev/Test Pricing", report.devtest_savings),
+        ]
+        
+        for name, savings in categories:
+            if savings.total_savings > 0:
+                pct = (savings.total_savings / report.total_savings * 100) if report.total_savings > 0 else 0
+                summary_table.add_row(
+                    name,
+                    f"${savings.total_savings:,.2f}",
+                    f"{pct:.1f}%"
+                )
+        
+        summary_table.add_row("", "", "", style="dim")
+        summary_table.add_row(
+            "[bold]TOTAL SAVINGS[/bold]",
+            f"[bold green]${report.total_savings:,.2f}[/bold green]",
+            f"[bold]{report.total_savings_percentage:.1f}%[/bold]"
+        )
+        
+        console.print(summary_table)
+        
+        # Generate reports
+        console.print("\n[bold]Generating reports...[/bold]")
+        
+        generator = ReportGenerator(output_directory)
+        generated_files = []
+        
+        if format == 'all':
+            task = progress.add_task(description="Writing HTML and Excel reports...", total=None)
+            html_path, excel_path = generator.generate_all(report)
+            progress.remove_task(task)
+            generated_files.extend([('HTML', html_path), ('Excel', excel_path)])
+            console.print(f"[green]✓[/green] HTML report: {html_path}")
+            console.print(f"[green]✓[/green] Excel report: {excel_path}")
+        
+        if format == 'html':
+            task = progress.add_task(description="Writing HTML report...", total=None)
+            html_path = generator.generate_html_report(report)
+            progress.remove_task(task)
+            generated_files.append(('HTML', html_path))
+            console.print(f"[green]✓[/green] HTML report: {html_path}")
+        
+        if format == 'excel':
+            task = progress.add_task(description="Writing Excel report...", total=None)
+            excel_path = generator.generate_excel_report(report)
+            progress.remove_task(task)
+            generated_files.append(('Excel', excel_path))
+            console.print(f"[green]✓[/green] Excel report: {excel_path}")
     
     console.print("\n[bold green]Report generation complete![/bold green]")
     
@@ -217,13 +255,14 @@ def test_connection(
     config_path: str = typer.Option("config.yaml", "--config", help="Path to config file")
 ):
     """Test the connection to the configured data source"""
+    from src import get_data_source
     
     console.print("[bold]Testing data source connection...[/bold]")
     
     config = load_config(config_path)
     
     try:
-        data_source = create_data_source(config)
+        data_source = get_data_source(config)
         
         if data_source.test_connection():
             console.print("[green]✓ Connection successful![/green]")
@@ -253,16 +292,20 @@ def list_subscriptions(
     months: int = typer.Option(1, "--months", "-m", help="Number of months to look back")
 ):
     """List subscriptions with cost data"""
+    from rich.table import Table
+    
+    from src import get_data_source
     
     config = load_config(config_path)
-    data_source = create_data_source(config)
+    data_source = get_data_source(config)
     
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=months * 30)
+    start_date, end_date = report_window(months)
     
     console.print(f"[bold]Fetching subscriptions for the last {months} month(s)...[/bold]")
     
-    costs_df = data_source.get_costs(start_date, end_date)
+    costs_df = data_source.get_costs(
+        start_date, end_date, columns=['SubAccountId', 'SubAccountName', 'EffectiveCost']
+    )
     
     if costs_df.empty:
         console.print("[yellow]No cost data found[/yellow]")
@@ -270,23 +313,42 @@ def list_subscriptions(
     
     # Group by subscription
     if 'SubAccountId' in costs_df.columns and 'SubAccountName' in costs_df.columns:
-        subs = costs_df.groupby(['SubAccountId', 'SubAccountName']).agg({
-            'EffectiveCost': 'sum'
-        }).reset_index()
+        # Group on categorical codes and skip groupby's own key sort; the
+        # result only needs ordering by cost, which is done once below
+        keys = ['SubAccountId', 'SubAccountName']
+        subs = costs_df[keys + ['EffectiveCost']].astype({key: 'category' for key in keys})
+        subs = subs.groupby(keys, sort=False, observed=True, as_index=False)['EffectiveCost'].sum()
+        subs = subs.sort_values('EffectiveCost', ascending=False)
         
-        table = Table(show_header=True, header_style="bold blue")
-        table.add_column("Subscription Name")
-        table.add_column("Subscription ID")
-        table.add_column("Total Cost", justify="right")
+        # Pull plain arrays once instead of building a Series per row
+        names = subs['SubAccountName'].astype(str).to_numpy()
+        ids = subs['SubAccountId'].astype(str).to_numpy()
+        costs = subs['EffectiveCost'].map('${:,.2f}'.format).to_numpy()
         
-        for _, row in subs.sort_values('EffectiveCost', ascending=False).iterrows():
-            table.add_row(
-                row['SubAccountName'],
-                row['SubAccountId'],
-                f"${row['EffectiveCost']:,.2f}"
+        if len(subs) <= TABLE_ROW_LIMIT:
+            table = Table(show_header=True, header_style="bold blue")
+            table.add_column("Subscription Name")
+            table.add_column("Subscription ID")
+            table.add_column("Total Cost", justify="right")
+            
+            for name, sub_id, cost in zip(names, ids, costs):
+                table.add_row(name, sub_id, cost)
+            
+            console.print(table)
+        else:
+            # Large listings: skip Rich's per-cell layout and print one
+            # pre-formatted fixed-width block
+            name_width = max(len("Subscription Name"), max(map(len, names)))
+            id_width = max(len("Subscription ID"), max(map(len, ids)))
+            cost_width = max(len("Total Cost"), max(map(len, costs)))
+            
+            header = f"{'Subscription Name':<{name_width}}  {'Subscription ID':<{id_width}}  {'Total Cost':>{cost_width}}"
+            lines = [header, "-" * len(header)]
+            lines.extend(
+                f"{name:<{name_width}}  {sub_id:<{id_width}}  {cost:>{cost_width}}"
+                for name, sub_id, cost in zip(names, ids, costs)
             )
-        
-        console.print(table)
+            console.print("\n".join(lines), markup=False, highlight=False, soft_wrap=True)
     else:
         console.print("[yellow]Subscription columns not found in data[/yellow]")
 
@@ -2,18 +2,38 @@
 Azure Savings Report - Source Package
 """
 
-from .data_sources import DataSource, ADXDataSource, StorageDataSource, RetailPricesAPI, create_data_source
-from .savings_calculator import SavingsCalculator, SavingsReport, SavingsSummary
-from .report_generator import ReportGenerator
+import importlib
 
-__all__ = [
-    'DataSource',
-    'ADXDataSource', 
-    'StorageDataSource',
-    'RetailPricesAPI',
-    'create_data_source',
-    'SavingsCalculator',
-    'SavingsReport',
-    'SavingsSummary',
-    'ReportGenerator'
-]
+# Public names and the submodule that defines them. Submodules are imported
+# on first attribute access (PEP 562) so that e.g. test-connection does not
+# pay for pandas/xlsxwriter imports it never uses.
+_LAZY = {
+    'DataSource': 'data_sources',
+    'ADXDataSource': 'data_sources',
+    'StorageDataSource': 'data_sources',
+    'RetailPricesAPI': 'data_sources',
+    'create_data_source': 'data_sources',
+    'get_data_source': 'data_sources',
+    'config_hash': 'data_sources',
+    'cached_get_costs': 'data_sources',
+    'COST_COLUMNS': 'data_sources',
+    'SavingsCalculator': 'savings_calculator',
+    'SavingsReport': 'savings_calculator',
+    'SavingsSummary': 'savings_calculator',
+    'ReportGenerator': 'report_generator'
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
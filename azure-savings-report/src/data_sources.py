@@ -3,16 +3,172 @@ Azure Savings Report - Data Sources
 Abstraction layer for different data sources (ADX, Storage, API)
 """
 
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import warnings
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
 import pandas as pd
 
 
+def _result_to_frame(result_table) -> pd.DataFrame:
+    """Convert a Kusto result table to a DataFrame with pyarrow-backed dtypes"""
+    from azure.kusto.data.helpers import dataframe_from_result_table
+    
+    # The SDK helper builds the frame column-wise with Kusto types applied;
+    # columns Arrow cannot infer (e.g. dynamic Tags dicts) stay as object
+    df = dataframe_from_result_table(result_table)
+    return df.convert_dtypes(dtype_backend="pyarrow")
+
+
+def _snap_to_days(start_date: datetime, end_date: datetime):
+    """Widen a date range to whole days so repeated queries use identical literals"""
+    # ADX only serves a query from its results cache when the query text
+    # matches exactly; callers usually pass datetime.now(), so round the start
+    # down and the end up to midnight before formatting
+    start = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    end = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    if end < end_date:
+        end += timedelta(days=1)
+    return start, end
+
+
+# Lets ADX answer repeated identical queries from its results cache
+_KQL_RESULTS_CACHE_HEADER = "set query_results_cache_max_age = time(1h);"
+
+
+def _query_parameters(**dates: datetime):
+    """Client request properties binding the given dates to declared KQL query parameters"""
+    from azure.kusto.data import ClientRequestProperties
+    
+    # Dates travel as parameters rather than literals, so the query text
+    # itself never changes between calls
+    properties = ClientRequestProperties()
+    for name, value in dates.items():
+        properties.set_parameter(name, value.strftime('%Y-%m-%dT%H:%M:%SZ'))
+    return properties
+
+# FOCUS columns the savings calculator reads; the set ADX projects by default
+COST_COLUMNS = [
+    'ChargePeriodStart', 'ChargePeriodEnd', 'BillingAccountId', 'BillingAccountName',
+    'SubAccountId', 'SubAccountName', 'ResourceId', 'ResourceName', 'ResourceType',
+    'ServiceName', 'ServiceCategory', 'Region', 'PricingCategory', 'ChargeCategory',
+    'BilledCost', 'EffectiveCost', 'ListCost', 'ListUnitPrice', 'ContractedUnitPrice',
+    'PricingQuantity', 'PricingUnit', 'CommitmentDiscountCategory', 'CommitmentDiscountId',
+    'CommitmentDiscountName', 'x_SkuDetails', 'Tags'
+]
+
+# Low-cardinality string columns held as pandas categoricals
+_CATEGORICAL_COLUMNS = [
+    'ResourceType', 'ServiceName', 'ServiceCategory', 'Region', 'PricingCategory',
+    'ChargeCategory', 'SubAccountName', 'CommitmentDiscountCategory'
+]
+
+
+class _ChunkStream(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks (e.g. a blob download)"""
+    
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b"")
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = memoryview(chunk)
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def _categorize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Store the low-cardinality string columns of a cost frame as categoricals"""
+    import pyarrow as pa
+    
+    # Repetitive strings dominate cost data memory; categories keep one
+    # copy of each distinct value plus small integer codes
+    categorical = {col: 'category' for col in _CATEGORICAL_COLUMNS if col in df.columns}
+    # astype('category') cannot read Arrow dictionary columns that contain
+    # nulls (e.g. from dictionary-encoded parquet); decode them first
+    decoded = {
+        col: df[col].astype(pd.ArrowDtype(df[col].dtype.pyarrow_dtype.value_type))
+        for col in categorical
+        if isinstance(df[col].dtype, pd.ArrowDtype) and pa.types.is_dictionary(df[col].dtype.pyarrow_dtype)
+    }
+    if decoded:
+        df = df.assign(**decoded)
+    return df.astype(categorical)
+
+
+def _decode_dictionaries(schema):
+    """Arrow schema with dictionary-encoded fields replaced by their value type"""
+    import pyarrow as pa
+    
+    return pa.schema(
+        [field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type) else field for field in schema],
+        metadata=schema.metadata
+    )
+
+
+@lru_cache(maxsize=8)
+def _kusto_client(cluster_uri: str):
+    """Kusto client shared by every ADXDataSource for the cluster"""
+    from azure.kusto.data import KustoClient, KustoConnectionStringBuilder
+    from azure.identity import DefaultAzureCredential
+    
+    # Use DefaultAzureCredential for authentication
+    credential = DefaultAzureCredential()
+    kcsb = KustoConnectionStringBuilder.with_azure_token_credential(
+        cluster_uri, credential
+    )
+    return KustoClient(kcsb)
+
+
+@lru_cache(maxsize=8)
+def _container_client(account_name: str, container_name: str):
+    """Blob container client shared by every StorageDataSource for the container"""
+    from azure.storage.blob import ContainerClient
+    from azure.identity import DefaultAzureCredential
+    
+    # Azure SDK clients are thread-safe, so parallel downloads share it too
+    credential = DefaultAzureCredential()
+    account_url = f"https://{account_name}.blob.core.windows.net"
+    return ContainerClient(
+        account_url, 
+        container_name, 
+        credential=credential
+    )
+
+
 @dataclass
 class CostRecord:
     """Standardized cost record based on FOCUS schema"""
+    # Explicit slots (dataclass(slots=True) needs Python 3.10): no per-record
+    # __dict__ if records are ever built in bulk
+    __slots__ = (
+        'charge_period_start', 'charge_period_end', 'billing_account_id',
+        'billing_account_name', 'sub_account_id', 'sub_account_name', 'resource_id',
+        'resource_name', 'resource_type', 'service_name', 'service_category', 'region',
+        'pricing_category', 'pricing_model', 'charge_category', 'billed_cost',
+        'effective_cost', 'list_cost', 'list_unit_price', 'contracted_unit_price',
+        'pricing_quantity', 'pricing_unit', 'commitment_discount_category',
+        'commitment_discount_id', 'commitment_discount_name', 'tags'
+    )
+    
     charge_period_start: datetime
     charge_period_end: datetime
     billing_account_id: str
@@ -45,13 +201,13 @@ class DataSource(ABC):
     """Abstract base class for data sources"""
     
     @abstractmethod
-    def get_costs(self, start_date: datetime, end_date: datetime) -> pd.DataFrame:
-        """Retrieve cost data for the specified date range"""
+    def get_costs(self, start_date: datetime, end_date: datetime, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Retrieve cost data for the specified date range, optionally only the given columns"""
         pass
     
     @abstractmethod
-    def get_prices(self) -> pd.DataFrame:
-        """Retrieve price sheet data"""
+    def get_prices(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> pd.DataFrame:
+        """Retrieve price sheet data, optionally limited to prices effective in the date range"""
         pass
     
     @abstractmethod
@@ -63,25 +219,20 @@ class DataSource(ABC):
 class ADXDataSource(DataSource):
     """Azure Data Explorer data source (for FinOps Hub)"""
     
-    def __init__(self, cluster_uri: str, database: str, costs_table: str = "Costs", prices_table: str = "Prices"):
+    def __init__(self, cluster_uri: str, database: str, costs_table: str = "Costs", prices_table: str = "Prices",
+                 savings_view: str = "CostsDailySavings"):
         self.cluster_uri = cluster_uri
         self.database = database
         self.costs_table = costs_table
         self.prices_table = prices_table
+        self.savings_view = savings_view
         self._client = None
+        self._has_savings_view = None
     
     def _get_client(self):
         """Get or create the Kusto client"""
         if self._client is None:
-            from azure.kusto.data import KustoClient, KustoConnectionStringBuilder
-            from azure.identity import DefaultAzureCredential
-            
-            # Use DefaultAzureCredential for authentication
-            credential = DefaultAzureCredential()
-            kcsb = KustoConnectionStringBuilder.with_azure_token_credential(
-                self.cluster_uri, credential
-            )
-            self._client = KustoClient(kcsb)
+            self._client = _kusto_client(self.cluster_uri)
         return self._client
     
     def test_connection(self) -> bool:
@@ -94,55 +245,55 @@ class ADXDataSource(DataSource):
             print(f"ADX connection failed: {e}")
             return False
     
-    def get_costs(self, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+    def get_costs(self, start_date: datetime, end_date: datetime, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """Query costs from ADX"""
         client = self._get_client()
+        start_date, end_date = _snap_to_days(start_date, end_date)
+        
+        # Every projected column is scanned and shipped, so callers that need
+        # only a few columns can narrow the projection
+        project = ",\n            ".join(columns or COST_COLUMNS)
         
         query = f"""
+        {_KQL_RESULTS_CACHE_HEADER}
+        declare query_parameters(StartDate:datetime, EndDate:datetime);
         {self.costs_table}
-        | where ChargePeriodStart >= datetime({start_date.strftime('%Y-%m-%d')})
-        | where ChargePeriodEnd <= datetime({end_date.strftime('%Y-%m-%d')})
+        | where ChargePeriodStart >= StartDate
+        | where ChargePeriodEnd <= EndDate
         | project 
-            ChargePeriodStart,
-            ChargePeriodEnd,
-            BillingAccountId,
-            BillingAccountName,
-            SubAccountId,
-            SubAccountName,
-            ResourceId,
-            ResourceName,
-            ResourceType,
-            ServiceName,
-            ServiceCategory,
-            Region,
-            PricingCategory,
-            ChargeCategory,
-            BilledCost,
-            EffectiveCost,
-            ListCost,
-            ListUnitPrice,
-            ContractedUnitPrice,
-            PricingQuantity,
-            PricingUnit,
-            CommitmentDiscountCategory,
-            CommitmentDiscountId,
-            CommitmentDiscountName,
-            x_SkuDetails,
-            Tags
+            {project}
         """
         
-        response = client.execute(self.database, query)
+        response = client.execute(
+            self.database, query, _query_parameters(StartDate=start_date, EndDate=end_date)
+        )
         
         # Convert to DataFrame
-        df = pd.DataFrame(response.primary_results[0])
-        return df
+        df = _result_to_frame(response.primary_results[0])
+        return _categorize_columns(df)
     
-    def get_prices(self) -> pd.DataFrame:
+    def get_prices(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> pd.DataFrame:
         """Query prices from ADX"""
         client = self._get_client()
         
+        # Filter on the effective period in ADX so only prices that overlap
+        # the report window are shipped back
+        dates = {}
+        date_filter = ""
+        if start_date is not None:
+            dates['StartDate'] = start_date
+            date_filter += "\n        | where x_EffectivePeriodEnd >= StartDate"
+        if end_date is not None:
+            dates['EndDate'] = end_date
+            date_filter += "\n        | where x_EffectivePeriodStart <= EndDate"
+        declare = ""
+        if dates:
+            declare = f"declare query_parameters({', '.join(f'{name}:datetime' for name in dates)});"
+        
         query = f"""
-        {self.prices_table}
+        {_KQL_RESULTS_CACHE_HEADER}
+        {declare}
+        {self.prices_table}{date_filter}
         | project
             x_SkuMeterId,
             x_SkuMeterName,
@@ -156,68 +307,144 @@ class ADXDataSource(DataSource):
             x_EffectivePeriodEnd
         """
         
-        response = client.execute(self.database, query)
-        df = pd.DataFrame(response.primary_results[0])
+        response = client.execute(self.database, query, _query_parameters(**dates))
+        df = _result_to_frame(response.primary_results[0])
         return df
     
+    def get_all_reports(self, start_date: datetime, end_date: datetime, names: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Run several pre-built QUERIES in one batch over a single scan of the date window"""
+        from .kql_queries import QUERIES, build_batch_query
+        
+        client = self._get_client()
+        start_date, end_date = _snap_to_days(start_date, end_date)
+        names = list(QUERIES) if names is None else names
+        
+        query = _KQL_RESULTS_CACHE_HEADER + "\n" + build_batch_query(names, self.costs_table)
+        response = client.execute(
+            self.database, query, _query_parameters(StartDate=start_date, EndDate=end_date)
+        )
+        
+        # The batch returns one primary result per query, in order
+        return {
+            name: _result_to_frame(result)
+            for name, result in zip(names, response.primary_results)
+        }
+    
+    def create_savings_view(self) -> None:
+        """Create the daily savings materialized view (one-time setup, needs database admin)"""
+        from .kql_queries import SAVINGS_VIEW_COMMAND
+        
+        client = self._get_client()
+        client.execute_mgmt(
+            self.database,
+            SAVINGS_VIEW_COMMAND.format(view_name=self.savings_view, costs_table=self.costs_table)
+        )
+        self._has_savings_view = None
+    
+    def has_savings_view(self) -> bool:
+        """Whether the daily savings materialized view exists (checked once per instance)"""
+        if self._has_savings_view is None:
+            client = self._get_client()
+            try:
+                response = client.execute_mgmt(self.database, f".show materialized-view {self.savings_view}")
+                self._has_savings_view = len(response.primary_results[0]) > 0
+            except Exception:
+                self._has_savings_view = False
+        return self._has_savings_view
+    
     def get_savings_summary(self, start_date: datetime, end_date: datetime) -> pd.DataFrame:
         """Get pre-aggregated savings summary from ADX"""
         client = self._get_client()
+        start_date, end_date = _snap_to_days(start_date, end_date)
+        parameters = _query_parameters(StartDate=start_date, EndDate=end_date)
+        
+        if self.has_savings_view():
+            from .kql_queries import SAVINGS_VIEW_SUMMARY_QUERY
+            
+            # SavingsCategory is already materialized per day in the view
+            query = _KQL_RESULTS_CACHE_HEADER + SAVINGS_VIEW_SUMMARY_QUERY.format(view_name=self.savings_view)
+            response = client.execute(self.database, query, parameters)
+            return _result_to_frame(response.primary_results[0])
+        
+        from .kql_queries import SAVINGS_CATEGORY_CASE
         
         # KQL query for comprehensive savings analysis
         query = f"""
-        let StartDate = datetime({start_date.strftime('%Y-%m-%d')});
-        let EndDate = datetime({end_date.strftime('%Y-%m-%d')});
+        {_KQL_RESULTS_CACHE_HEADER}
+        declare query_parameters(StartDate:datetime, EndDate:datetime);
         //
         {self.costs_table}
         | where ChargePeriodStart >= StartDate and ChargePeriodEnd <= EndDate
+        | project
+            ChargeDay = bin(ChargePeriodStart, 1d),
+            PricingCategory, CommitmentDiscountCategory, x_SkuDetails, SubAccountName,
+            ServiceCategory, BilledCost, EffectiveCost, ListCost
         | extend 
-            SavingsCategory = case(
-                PricingCategory == "Committed" and CommitmentDiscountCategory == "Usage", "Reserved Instance",
-                PricingCategory == "Committed" and CommitmentDiscountCategory == "Spend", "Savings Plan",
-                x_SkuDetails contains "AHB" or x_SkuDetails contains "HybridBenefit", "Azure Hybrid Benefit",
-                SubAccountName contains "DevTest" or SubAccountName contains "Dev/Test", "Dev/Test Pricing",
-                "Standard"
-            )
+            SavingsCategory = {SAVINGS_CATEGORY_CASE}
         | summarize 
             BilledCost = sum(BilledCost),
             EffectiveCost = sum(EffectiveCost),
             ListCost = sum(ListCost)
-            by SavingsCategory, ServiceCategory, bin(ChargePeriodStart, 1d)
+            by SavingsCategory, ServiceCategory, ChargePeriodStart = ChargeDay
         | extend 
             NegotiatedSavings = ListCost - BilledCost,
             CommitmentSavings = BilledCost - EffectiveCost
         """
         
-        response = client.execute(self.database, query)
-        df = pd.DataFrame(response.primary_results[0])
+        response = client.execute(self.database, query, parameters)
+        df = _result_to_frame(response.primary_results[0])
         return df
 
 
 class StorageDataSource(DataSource):
     """Azure Storage data source (for Cost Management exports)"""
     
+    # Concurrent blob downloads when reading CSV exports
+    MAX_DOWNLOAD_WORKERS = 32
+    # Rows parsed per CSV chunk; out-of-range rows are dropped chunk by chunk
+    CSV_CHUNK_ROWS = 200_000
+    
     def __init__(self, account_name: str, container_name: str, export_path: str):
         self.account_name = account_name
         self.container_name = container_name
         self.export_path = export_path
         self._container_client = None
+        self._filesystem = None
     
     def _get_container_client(self):
         """Get or create the blob container client"""
         if self._container_client is None:
-            from azure.storage.blob import ContainerClient
-            from azure.identity import DefaultAzureCredential
-            
-            credential = DefaultAzureCredential()
-            account_url = f"https://{self.account_name}.blob.core.windows.net"
-            self._container_client = ContainerClient(
-                account_url, 
-                self.container_name, 
-                credential=credential
-            )
+            self._container_client = _container_client(self.account_name, self.container_name)
         return self._container_client
     
+    def _download_csv(self, blob_name: str, start_date: datetime, end_date: datetime, columns: Optional[List[str]]) -> pd.DataFrame:
+        """Stream one CSV export blob, keeping only in-range rows of each chunk"""
+        blob_client = self._get_container_client().get_blob_client(blob_name)
+        stream = io.BufferedReader(_ChunkStream(blob_client.download_blob().chunks()))
+        
+        reader = pd.read_csv(
+            stream,
+            chunksize=self.CSV_CHUNK_ROWS,
+            # ChargePeriodStart is always read so each chunk can be filtered
+            usecols=None if columns is None else (lambda column: column in columns or column == 'ChargePeriodStart'),
+            dtype_backend="pyarrow"
+        )
+        chunks = []
+        with reader:
+            for chunk in reader:
+                if 'ChargePeriodStart' in chunk.columns:
+                    chunk['ChargePeriodStart'] = pd.to_datetime(chunk['ChargePeriodStart'])
+                    charge_start = chunk['ChargePeriodStart']
+                    chunk = chunk[(charge_start >= start_date) & (charge_start <= end_date)]
+                chunks.append(chunk)
+        
+        if not chunks:
+            return pd.DataFrame()
+        df = pd.concat(chunks, ignore_index=True)
+        if columns is None:
+            return df
+        return df[[name for name in df.columns if name in columns]]
+    
     def test_connection(self) -> bool:
         """Test connection to storage"""
         try:
@@ -229,45 +456,99 @@ class StorageDataSource(DataSource):
             print(f"Storage connection failed: {e}")
             return False
     
-    def get_costs(self, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+    def _get_filesystem(self):
+        """Get or create an fsspec filesystem over the storage account"""
+        if self._filesystem is None:
+            import adlfs
+            from azure.identity import DefaultAzureCredential
+            
+            self._filesystem = adlfs.AzureBlobFileSystem(
+                account_name=self.account_name,
+                credential=DefaultAzureCredential()
+            )
+        return self._filesystem
+    
+    def _read_parquet_exports(self, blob_names, start_date: datetime, end_date: datetime, columns: Optional[List[str]]) -> pd.DataFrame:
+        """Read parquet exports as one Arrow dataset, pushing the date filter and column selection into the scan"""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        
+        paths = [f"{self.container_name}/{name}" for name in blob_names]
+        dataset = ds.dataset(paths, filesystem=self._get_filesystem(), format="parquet")
+        # A dataset takes its schema from the first file only; unify every
+        # export's schema so columns added in later months are kept and
+        # type drift between months (int vs double, dictionary vs plain
+        # strings) is cast instead of failing the scan
+        schema = pa.unify_schemas(
+            [_decode_dictionaries(fragment.physical_schema) for fragment in dataset.get_fragments()],
+            promote_options="permissive"
+        )
+        dataset = ds.dataset(paths, schema=schema, filesystem=self._get_filesystem(), format="parquet")
+        # ChargePeriodStart is always read so string dates can be filtered below
+        scan_columns = None
+        if columns is not None:
+            scan_columns = [name for name in columns if name in schema.names]
+            if 'ChargePeriodStart' in schema.names and 'ChargePeriodStart' not in scan_columns:
+                scan_columns.append('ChargePeriodStart')
+        
+        # Only timestamp columns can be compared in the scan; string dates
+        # are parsed and filtered after conversion
+        row_filter = None
+        if 'ChargePeriodStart' in schema.names and pa.types.is_timestamp(schema.field('ChargePeriodStart').type):
+            ts_type = schema.field('ChargePeriodStart').type
+            charge_start = ds.field('ChargePeriodStart')
+            row_filter = (
+                (charge_start >= pa.scalar(start_date, type=ts_type)) &
+                (charge_start <= pa.scalar(end_date, type=ts_type))
+            )
+        
+        table = dataset.to_table(columns=scan_columns, filter=row_filter)
+        df = table.to_pandas(self_destruct=True, types_mapper=pd.ArrowDtype)
+        
+        if row_filter is None and 'ChargePeriodStart' in df.columns:
+            df['ChargePeriodStart'] = pd.to_datetime(df['ChargePeriodStart'])
+            df = df[(df['ChargePeriodStart'] >= start_date) & (df['ChargePeriodStart'] <= end_date)]
+        if columns is None:
+            return df
+        return df[[name for name in df.columns if name in columns]]
+    
+    def get_costs(self, start_date: datetime, end_date: datetime, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """Read cost exports from storage"""
-        import io
+        from concurrent.futures import ThreadPoolExecutor
         
         client = self._get_container_client()
+        # None reads every export column, not just the FOCUS set
+        columns = list(columns) if columns else None
         
         # List all export files in the path
-        blobs = client.list_blobs(name_starts_with=self.export_path)
+        blobs = list(client.list_blobs(name_starts_with=self.export_path))
+        parquet_blobs = [blob.name for blob in blobs if blob.name.endswith('.parquet')]
+        csv_blobs = [blob.name for blob in blobs if blob.name.endswith('.csv')]
         
         dfs = []
-        for blob in blobs:
-            # Check if file is in date range based on filename pattern
-            if blob.name.endswith('.parquet'):
-                blob_client = client.get_blob_client(blob.name)
-                data = blob_client.download_blob().readall()
-                df = pd.read_parquet(io.BytesIO(data))
-                dfs.append(df)
-            elif blob.name.endswith('.csv'):
-                blob_client = client.get_blob_client(blob.name)
-                data = blob_client.download_blob().readall()
-                df = pd.read_csv(io.BytesIO(data))
-                dfs.append(df)
+        if parquet_blobs:
+            dfs.append(self._read_parquet_exports(parquet_blobs, start_date, end_date, columns))
+        if csv_blobs:
+            # Each download is a blocking round trip, so fan them out
+            with ThreadPoolExecutor(max_workers=min(self.MAX_DOWNLOAD_WORKERS, len(csv_blobs))) as executor:
+                dfs.extend(executor.map(
+                    lambda name: self._download_csv(name, start_date, end_date, columns), csv_blobs
+                ))
         
         if not dfs:
             return pd.DataFrame()
         
-        combined_df = pd.concat(dfs, ignore_index=True)
+        combined_df = dfs[0] if len(dfs) == 1 else pd.concat(dfs, ignore_index=True, copy=False)
         
-        # Filter by date range
-        if 'ChargePeriodStart' in combined_df.columns:
+        # Every source is already trimmed to the date range; only a mixed
+        # parquet/CSV concat can leave the column as object dtype
+        if 'ChargePeriodStart' in combined_df.columns and combined_df['ChargePeriodStart'].dtype == object:
             combined_df['ChargePeriodStart'] = pd.to_datetime(combined_df['ChargePeriodStart'])
-            combined_df = combined_df[
-                (combined_df['ChargePeriodStart'] >= start_date) & 
-                (combined_df['ChargePeriodStart'] <= end_date)
-            ]
         
-        return combined_df
+        # Categorize once all chunks are combined so the categories agree
+        return _categorize_columns(combined_df)
     
-    def get_prices(self) -> pd.DataFrame:
+    def get_prices(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> pd.DataFrame:
         """Read price sheet from storage"""
         # Price sheets are typically in a separate export
         # Implementation depends on your export configuration
@@ -278,75 +559,182 @@ class RetailPricesAPI:
     """Azure Retail Prices API client for comparison against public prices"""
     
     API_URL = "https://prices.azure.com/api/retail/prices"
+    # Bulk fetches stop once this many items are collected
+    MAX_BULK_ITEMS = 10000
+    # Pages requested concurrently when the API pages by $skip
+    MAX_CONCURRENT_PAGES = 16
+    # SKUs combined into one OR filter (keeps the URL within length limits)
+    SKUS_PER_REQUEST = 15
+    # Retail prices kept in memory per client
+    CACHE_SIZE = 8192
+    # On-disk HTTP cache shared across runs
+    CACHE_DIR = ".cache"
+    # Seconds before an API request times out
+    REQUEST_TIMEOUT = 30
     
     def __init__(self, cache_enabled: bool = True, cache_ttl_hours: int = 24):
         self.cache_enabled = cache_enabled
         self.cache_ttl_hours = cache_ttl_hours
-        self._cache = {}
-        self._cache_time = {}
+        # Keyed on (sku_id, region, TTL bucket): entries expire when the
+        # bucket rolls over and least recently used ones are evicted
+        self._cached_price = lru_cache(maxsize=self.CACHE_SIZE)(self._fetch_retail_price)
+        # Prices from get_retail_prices_bulk for the current TTL bucket
+        self._prefetched = {}
+        self._prefetched_bucket = None
+        self._session = None
+    
+    def _get_session(self):
+        """Get or create the HTTP session, backed by an on-disk cache when enabled"""
+        if self._session is None:
+            if self.cache_enabled:
+                from requests_cache import CachedSession
+                
+                # Persists responses across runs; honors the API's
+                # Cache-Control/ETag headers and serves stale data on errors
+                Path(self.CACHE_DIR).mkdir(parents=True, exist_ok=True)
+                self._session = CachedSession(
+                    str(Path(self.CACHE_DIR) / "retail_prices"),
+                    backend="sqlite",
+                    expire_after=timedelta(hours=self.cache_ttl_hours),
+                    allowable_methods=("GET",),
+                    cache_control=True,
+                    stale_if_error=True
+                )
+            else:
+                import requests
+                self._session = requests.Session()
+            
+            from requests.adapters import HTTPAdapter
+            
+            # Bulk fetches share the session across MAX_CONCURRENT_PAGES
+            # threads; size the pool so their connections are reused
+            self._session.mount("https://", HTTPAdapter(pool_maxsize=self.MAX_CONCURRENT_PAGES))
+        return self._session
     
     def get_retail_price(self, sku_id: str, region: str = "eastus") -> Optional[float]:
         """Get retail price for a specific SKU"""
-        import requests
-        
-        cache_key = f"{sku_id}_{region}"
-        
-        # Check cache
-        if self.cache_enabled and cache_key in self._cache:
-            cache_age = datetime.now() - self._cache_time[cache_key]
-            if cache_age < timedelta(hours=self.cache_ttl_hours):
-                return self._cache[cache_key]
+        try:
+            if self.cache_enabled:
+                ttl_bucket = self._ttl_bucket()
+                if self._prefetched_bucket == ttl_bucket and (sku_id, region) in self._prefetched:
+                    return self._prefetched[(sku_id, region)]
+                return self._cached_price(sku_id, region, ttl_bucket)
+            return self._fetch_retail_price(sku_id, region)
+        except Exception as e:
+            print(f"Error fetching retail price: {e}")
         
-        # Query API
+        return None
+    
+    def _ttl_bucket(self) -> int:
+        """Current cache period; cached prices expire when it changes"""
+        return int(time.time() // (self.cache_ttl_hours * 3600))
+    
+    def _fetch_retail_price(self, sku_id: str, region: str, ttl_bucket: int = 0) -> Optional[float]:
+        """Query the API for one SKU; raises on request errors so they are never cached"""
         filter_str = f"skuId eq '{sku_id}' and armRegionName eq '{region}'"
         params = {"$filter": filter_str}
         
-        try:
-            response = requests.get(self.API_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("Items"):
-                price = data["Items"][0].get("retailPrice", 0)
-                
-                # Cache result
-                if self.cache_enabled:
-                    self._cache[cache_key] = price
-                    self._cache_time[cache_key] = datetime.now()
-                
-                return price
-        except Exception as e:
-            print(f"Error fetching retail price: {e}")
+        data = self._get_json(self.API_URL, params)
         
+        if data.get("Items"):
+            return data["Items"][0].get("retailPrice", 0)
         return None
     
-    def get_prices_bulk(self, service_family: str = None, region: str = "eastus") -> pd.DataFrame:
-        """Get retail prices for a service family"""
-        import requests
+    def get_retail_prices_bulk(self, sku_ids: List[str], region: str = "eastus") -> Dict[str, float]:
+        """Get retail prices for many SKUs, SKUS_PER_REQUEST per API call"""
+        sku_ids = list(dict.fromkeys(sku_ids))
+        batches = [sku_ids[i:i + self.SKUS_PER_REQUEST] for i in range(0, len(sku_ids), self.SKUS_PER_REQUEST)]
+        prices = self._fetch_sku_batches(batches, region) if batches else {}
         
-        items = []
-        next_page = self.API_URL
+        if self.cache_enabled:
+            ttl_bucket = self._ttl_bucket()
+            if self._prefetched_bucket != ttl_bucket:
+                self._prefetched = {}
+                self._prefetched_bucket = ttl_bucket
+            self._prefetched.update(((sku_id, region), price) for sku_id, price in prices.items())
         
-        params = {"armRegionName": region}
-        if service_family:
-            params["$filter"] = f"serviceFamily eq '{service_family}'"
+        return prices
+    
+    def _fetch_sku_batches(self, batches: List[List[str]], region: str) -> Dict[str, float]:
+        """Fetch each SKU batch with one OR-composed filter, up to MAX_CONCURRENT_PAGES at a time"""
+        from concurrent.futures import ThreadPoolExecutor
         
-        while next_page:
+        def fetch_batch(batch):
+            sku_filter = " or ".join(f"skuId eq '{sku_id}'" for sku_id in batch)
+            url, params = self.API_URL, {"$filter": f"({sku_filter}) and armRegionName eq '{region}'"}
+            items = []
             try:
-                response = requests.get(next_page, params=params if next_page == self.API_URL else None)
-                response.raise_for_status()
-                data = response.json()
-                items.extend(data.get("Items", []))
-                next_page = data.get("NextPageLink")
-                
-                # Limit to avoid too many API calls
-                if len(items) > 10000:
-                    break
+                while url:
+                    data = self._get_json(url, params)
+                    items.extend(data.get("Items", []))
+                    url, params = data.get("NextPageLink"), None
             except Exception as e:
                 print(f"Error fetching retail prices: {e}")
-                break
+            return items
+        
+        # Worker threads rather than an event loop, so this also works when
+        # called from a running loop (notebooks, async callers)
+        self._get_session()  # created before the workers share it
+        prices = {}
+        with ThreadPoolExecutor(max_workers=min(self.MAX_CONCURRENT_PAGES, len(batches))) as executor:
+            for items in executor.map(fetch_batch, batches):
+                for item in items:
+                    # First item per SKU, as get_retail_price returns
+                    prices.setdefault(item.get("skuId"), item.get("retailPrice", 0))
         
+        return prices
+    
+    def _get_json(self, url: str, params: Optional[dict]) -> dict:
+        """GET one API page through the shared session (on-disk cached when enabled)"""
+        response = self._get_session().get(url, params=params, timeout=self.REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+    
+    def get_prices_bulk(self, service_family: str = None, region: str = "eastus") -> pd.DataFrame:
+        """Get retail prices for a service family"""
+        params = {"armRegionName": region}
+        if service_family:
+            params["$filter"] = f"serviceFamily eq '{service_family}'"
+        
+        items = self._fetch_price_pages(params)
         return pd.DataFrame(items)
+    
+    def _fetch_price_pages(self, params: dict) -> list:
+        """Page through the API, fetching up to MAX_CONCURRENT_PAGES pages at a time"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        items = []
+        
+        try:
+            data = self._get_json(self.API_URL, params)
+            items.extend(data.get("Items", []))
+            next_page = data.get("NextPageLink")
+            page_size = len(data.get("Items", []))
+            
+            # Blocking requests on worker threads rather than an event loop,
+            # so this also works when called from a running loop (notebooks)
+            with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_PAGES) as executor:
+                # Limit to avoid too many API calls
+                while next_page and len(items) <= self.MAX_BULK_ITEMS:
+                    if "$skip=" in next_page and page_size:
+                        # Pages are addressed by $skip, so request the next
+                        # batch of offsets at once instead of following
+                        # NextPageLink one round trip at a time
+                        remaining_pages = -(-(self.MAX_BULK_ITEMS + 1 - len(items)) // page_size)
+                        skips = range(len(items), len(items) + page_size * min(self.MAX_CONCURRENT_PAGES, remaining_pages), page_size)
+                        pages = list(executor.map(lambda skip: self._get_json(self.API_URL, {**params, "$skip": skip}), skips))
+                    else:
+                        pages = [self._get_json(next_page, None)]
+                    
+                    for page in pages:
+                        items.extend(page.get("Items", []))
+                        next_page = page.get("NextPageLink")
+                        if not next_page:
+                            break
+        except Exception as e:
+            print(f"Error fetching retail prices: {e}")
+        
+        return items
 
 
 def create_data_source(config: dict) -> DataSource:
@@ -359,7 +747,8 @@ def create_data_source(config: dict) -> DataSource:
             cluster_uri=adx_config["cluster_uri"],
             database=adx_config["database"],
             costs_table=adx_config.get("costs_table", "Costs"),
-            prices_table=adx_config.get("prices_table", "Prices")
+            prices_table=adx_config.get("prices_table", "Prices"),
+            savings_view=adx_config.get("savings_view", "CostsDailySavings")
         )
     elif source_type == "storage":
         storage_config = config["data_source"]["storage"]
@@ -370,3 +759,127 @@ def create_data_source(config: dict) -> DataSource:
         )
     else:
         raise ValueError(f"Unknown data source type: {source_type}")
+
+
+# Process-wide data sources, keyed by a hash of their configuration so
+# repeated commands reuse the same authenticated clients
+_DATA_SOURCE_CACHE: Dict[str, DataSource] = {}
+_DATA_SOURCE_LOCK = threading.Lock()
+
+
+def config_hash(config: dict) -> str:
+    """Stable hash of the data source section of a config"""
+    payload = json.dumps(config.get("data_source", {}), sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def get_data_source(config: dict) -> DataSource:
+    """Return the shared data source for this config, creating it on first use"""
+    key = config_hash(config)
+    with _DATA_SOURCE_LOCK:
+        data_source = _DATA_SOURCE_CACHE.get(key)
+        if data_source is None:
+            data_source = create_data_source(config)
+            _DATA_SOURCE_CACHE[key] = data_source
+    return data_source
+
+
+# Parquet schema metadata key listing the cached columns stored as JSON text
+_JSON_COLUMNS_KEY = b"azure_savings_report.json_columns"
+
+
+def _json_encode_objects(df: pd.DataFrame):
+    """Copy of df with object columns holding non-string values as JSON text, plus their names"""
+    # Kusto dynamic columns (Tags, x_SkuDetails) arrive as dicts mixed with
+    # strings and nulls, which Arrow cannot store as one column type
+    encoded = {}
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        present = df[col].notna().to_numpy()
+        values = df[col].to_numpy()
+        if all(isinstance(value, str) for value in values[present]):
+            continue
+        encoded[col] = pd.Series(
+            [json.dumps(value, default=str) if keep else None for value, keep in zip(values, present)],
+            index=df.index, dtype=object
+        )
+    return (df.assign(**encoded) if encoded else df), list(encoded)
+
+
+def _write_cost_cache(df: pd.DataFrame, cache_file: Path) -> None:
+    """Write a cost frame to the cache atomically, JSON-encoding dict-valued columns"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    df, json_columns = _json_encode_objects(df)
+    table = pa.Table.from_pandas(df)
+    if json_columns:
+        metadata = dict(table.schema.metadata or {})
+        metadata[_JSON_COLUMNS_KEY] = json.dumps(json_columns).encode("utf-8")
+        table = table.replace_schema_metadata(metadata)
+    
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(".tmp")
+    pq.write_table(table, tmp_file, compression="zstd")
+    os.replace(tmp_file, cache_file)
+
+
+def _read_cost_cache(cache_file: Path) -> pd.DataFrame:
+    """Read a cached cost frame back with the dtypes get_costs returned"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    df = pd.read_parquet(cache_file, dtype_backend="pyarrow")
+    # Categoricals come back as Arrow dictionary columns; decode them to
+    # plain Arrow strings and categorize them the same way get_costs does,
+    # so a cache hit returns the same frame shape as a miss
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.ArrowDtype) and pa.types.is_dictionary(dtype.pyarrow_dtype):
+            df[col] = df[col].astype(pd.ArrowDtype(dtype.pyarrow_dtype.value_type))
+    
+    # Dict-valued columns were stored as JSON text; restore the objects
+    metadata = pq.read_schema(cache_file).metadata or {}
+    for col in json.loads(metadata.get(_JSON_COLUMNS_KEY, b"[]")):
+        present = df[col].notna().to_numpy()
+        values = df[col].to_numpy(dtype=object)
+        df[col] = pd.Series(
+            [json.loads(value) if keep else None for value, keep in zip(values, present)],
+            index=df.index, dtype=object
+        )
+    return _categorize_columns(df)
+
+
+def cached_get_costs(
+    data_source: DataSource,
+    start_date: datetime,
+    end_date: datetime,
+    cfg_hash: str,
+    cache_dir: str = ".cache/costs",
+    ttl_hours: int = 24,
+    columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """get_costs with a parquet-backed on-disk cache keyed on (config hash, start, end, columns)"""
+    # Key on calendar days, the same resolution the cost queries filter on,
+    # so re-running within a day hits the cache despite datetime.now() bounds
+    key = f"{cfg_hash}|{start_date.strftime('%Y-%m-%d')}|{end_date.strftime('%Y-%m-%d')}"
+    if columns:
+        key += "|" + ",".join(sorted(columns))
+    cache_file = Path(cache_dir) / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.parquet"
+    
+    if cache_file.exists() and time.time() - cache_file.stat().st_mtime < ttl_hours * 3600:
+        try:
+            return _read_cost_cache(cache_file)
+        except Exception as e:
+            warnings.warn(f"Ignoring unreadable cost cache {cache_file}: {e}", RuntimeWarning)
+    
+    df = data_source.get_costs(start_date, end_date, columns)
+    
+    if not df.empty:
+        try:
+            _write_cost_cache(df, cache_file)
+        except Exception as e:
+            warnings.warn(f"Could not cache cost data: {e}", RuntimeWarning)
+    
+    return df
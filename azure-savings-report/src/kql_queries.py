@@ -3,6 +3,20 @@ Azure Savings Report - KQL Queries for ADX
 Pre-built KQL queries for common savings analysis scenarios
 """
 
+from typing import List, Optional
+
+# SavingsCategory classification shared by the summary query, the daily
+# savings view and ADXDataSource.get_savings_summary, so every path labels
+# rows alike. contains is the same case-insensitive substring test that
+# SavingsCalculator._categorize_savings runs, with the same default label.
+SAVINGS_CATEGORY_CASE = """case(
+        PricingCategory == "Committed" and CommitmentDiscountCategory == "Usage", "Reserved Instance",
+        PricingCategory == "Committed" and CommitmentDiscountCategory == "Spend", "Savings Plan",
+        x_SkuDetails contains "AHB" or x_SkuDetails contains "HybridBenefit" or x_SkuDetails contains "Hybrid Benefit", "Azure Hybrid Benefit",
+        SubAccountName contains "DevTest" or SubAccountName contains "Dev/Test" or SubAccountName contains "Dev-Test", "Dev/Test Pricing",
+        "Negotiated Rate"
+    )"""
+
 # Comprehensive savings summary query
 SAVINGS_SUMMARY_QUERY = """
 // Azure Savings Realization Summary
@@ -12,14 +26,9 @@ let EndDate = datetime({end_date});
 //
 Costs
 | where ChargePeriodStart >= StartDate and ChargePeriodEnd <= EndDate
+| project PricingCategory, CommitmentDiscountCategory, x_SkuDetails, SubAccountName, ListCost, BilledCost, EffectiveCost
 | extend 
-    SavingsCategory = case(
-        PricingCategory == "Committed" and CommitmentDiscountCategory == "Usage", "Reserved Instance",
-        PricingCategory == "Committed" and CommitmentDiscountCategory == "Spend", "Savings Plan",
-        x_SkuDetails has_any ("AHB", "HybridBenefit", "Hybrid Benefit"), "Azure Hybrid Benefit",
-        SubAccountName has_any ("DevTest", "Dev/Test", "Dev-Test"), "Dev/Test Pricing",
-        "Negotiated Rate"
-    )
+    SavingsCategory = """ + SAVINGS_CATEGORY_CASE + """
 | summarize 
     RetailCost = sum(ListCost),
     NegotiatedCost = sum(BilledCost),
@@ -28,8 +37,7 @@ Costs
 | extend 
     NegotiatedSavings = RetailCost - NegotiatedCost,
     CommitmentSavings = NegotiatedCost - EffectiveCost,
-    TotalSavings = RetailCost - EffectiveCost
-| extend 
+    TotalSavings = RetailCost - EffectiveCost,
     SavingsPercentage = round(TotalSavings / RetailCost * 100, 2)
 | order by TotalSavings desc
 """
@@ -42,6 +50,7 @@ let EndDate = datetime({end_date});
 //
 Costs
 | where ChargePeriodStart >= StartDate and ChargePeriodEnd <= EndDate
+| project ServiceCategory, ListCost, BilledCost, EffectiveCost
 | summarize 
     RetailCost = sum(ListCost),
     NegotiatedCost = sum(BilledCost),
@@ -50,8 +59,7 @@ Costs
 | extend 
     NegotiatedSavings = RetailCost - NegotiatedCost,
     CommitmentSavings = NegotiatedCost - EffectiveCost,
-    TotalSavings = RetailCost - EffectiveCost
-| extend 
+    TotalSavings = RetailCost - EffectiveCost,
     SavingsPercentage = round(TotalSavings / RetailCost * 100, 2)
 | where TotalSavings > 0
 | order by TotalSavings desc
@@ -66,16 +74,16 @@ let EndDate = datetime({end_date});
 //
 Costs
 | where ChargePeriodStart >= StartDate and ChargePeriodEnd <= EndDate
+| project Month = startofmonth(ChargePeriodStart), ListCost, BilledCost, EffectiveCost
 | summarize 
     RetailCost = sum(ListCost),
     NegotiatedCost = sum(BilledCost),
     EffectiveCost = sum(EffectiveCost)
-    by Month = startofmonth(ChargePeriodStart)
+    by Month
 | extend 
     NegotiatedSavings = RetailCost - NegotiatedCost,
     CommitmentSavings = NegotiatedCost - EffectiveCost,
-    TotalSavings = RetailCost - EffectiveCost
-| extend 
+    TotalSavings = RetailCost - EffectiveCost,
     SavingsPercentage = round(TotalSavings / RetailCost * 100, 2)
 | order by Month asc
 """
@@ -89,6 +97,7 @@ let EndDate = datetime({end_date});
 Costs
 | where ChargePeriodStart >= StartDate and ChargePeriodEnd <= EndDate
 | where PricingCategory == "Committed" and CommitmentDiscountCategory == "Usage"
+| project CommitmentDiscountId, CommitmentDiscountName, ServiceCategory, ListCost, EffectiveCost, PricingQuantity
 | summarize 
     RetailCost = sum(ListCost),
     EffectiveCost = sum(EffectiveCost),
@@ -96,7 +105,7 @@ Costs
     by CommitmentDiscountId, CommitmentDiscountName, ServiceCategory
 | extend 
     Savings = RetailCost - EffectiveCost,
-    SavingsPercentage = round((RetailCost - EffectiveCost) / RetailCost * 100, 2)
+    SavingsPercentage = round(Savings / RetailCost * 100, 2)
 | order by Savings desc
 """
 
@@ -109,13 +118,14 @@ let EndDate = datetime({end_date});
 Costs
 | where ChargePeriodStart >= StartDate and ChargePeriodEnd <= EndDate
 | where PricingCategory == "Committed" and CommitmentDiscountCategory == "Spend"
+| project CommitmentDiscountId, CommitmentDiscountName, ServiceCategory, ListCost, EffectiveCost
 | summarize 
     RetailCost = sum(ListCost),
     EffectiveCost = sum(EffectiveCost)
     by CommitmentDiscountId, CommitmentDiscountName, ServiceCategory
 | extend 
     Savings = RetailCost - EffectiveCost,
-    SavingsPercentage = round((RetailCost - EffectiveCost) / RetailCost * 100, 2)
+    SavingsPercentage = round(Savings / RetailCost * 100, 2)
 | order by Savings desc
 """
 
@@ -130,6 +140,7 @@ Costs
 | where x_SkuDetails has_any ("AHB", "HybridBenefit", "Hybrid Benefit", "AHUB")
     or x_SkuMeterName has "Windows"
     or x_SkuMeterName has "SQL"
+| project x_SkuMeterName, ServiceCategory, ResourceId, ListCost, EffectiveCost
 | extend 
     AHBType = case(
         x_SkuMeterName has "SQL", "SQL Server",
@@ -143,7 +154,7 @@ Costs
     by AHBType, ServiceCategory
 | extend 
     Savings = RetailCost - EffectiveCost,
-    SavingsPercentage = round((RetailCost - EffectiveCost) / RetailCost * 100, 2)
+    SavingsPercentage = round(Savings / RetailCost * 100, 2)
 | order by Savings desc
 """
 
@@ -156,6 +167,7 @@ let EndDate = datetime({end_date});
 Costs
 | where ChargePeriodStart >= StartDate and ChargePeriodEnd <= EndDate
 | where PricingCategory == "Standard" // On-demand pricing only
+| project ServiceCategory, x_SkuMeterName, PricingQuantity, ListUnitPrice, ContractedUnitPrice, ListCost, BilledCost
 | summarize 
     TotalQuantity = sum(PricingQuantity),
     AvgListPrice = avg(ListUnitPrice),
@@ -179,6 +191,7 @@ let EndDate = datetime({end_date});
 //
 Costs
 | where ChargePeriodStart >= StartDate and ChargePeriodEnd <= EndDate
+| project SubAccountId, SubAccountName, ListCost, BilledCost, EffectiveCost
 | summarize 
     RetailCost = sum(ListCost),
     NegotiatedCost = sum(BilledCost),
@@ -187,8 +200,7 @@ Costs
 | extend 
     NegotiatedSavings = RetailCost - NegotiatedCost,
     CommitmentSavings = NegotiatedCost - EffectiveCost,
-    TotalSavings = RetailCost - EffectiveCost
-| extend 
+    TotalSavings = RetailCost - EffectiveCost,
     SavingsPercentage = round(TotalSavings / RetailCost * 100, 2)
 | order by TotalSavings desc
 """
@@ -201,19 +213,51 @@ let EndDate = datetime({end_date});
 //
 Costs
 | where ChargePeriodStart >= StartDate and ChargePeriodEnd <= EndDate
+| project ResourceId, ResourceName, ServiceCategory, SubAccountName, ListCost, EffectiveCost
 | summarize 
     RetailCost = sum(ListCost),
     EffectiveCost = sum(EffectiveCost)
     by ResourceId, ResourceName, ServiceCategory, SubAccountName
 | extend 
     TotalSavings = RetailCost - EffectiveCost,
-    SavingsPercentage = round((RetailCost - EffectiveCost) / RetailCost * 100, 2)
+    SavingsPercentage = round(TotalSavings / RetailCost * 100, 2)
 | where TotalSavings > 0
 | order by TotalSavings desc
 | take 50
 """
 
 
+# One-time setup: materialized view holding daily costs per savings category,
+# so SavingsCategory is computed at ingest rather than on every summary query.
+# Used by ADXDataSource.get_savings_summary when present.
+SAVINGS_VIEW_COMMAND = """
+.create async ifnotexists materialized-view with (backfill=true) {view_name} on table {costs_table}
+{{
+    {costs_table}
+    | extend 
+        SavingsCategory = """ + SAVINGS_CATEGORY_CASE + """
+    | summarize 
+        BilledCost = sum(BilledCost),
+        EffectiveCost = sum(EffectiveCost),
+        ListCost = sum(ListCost)
+        by SavingsCategory, ServiceCategory, ChargeDay = bin(ChargePeriodStart, 1d)
+}}
+"""
+
+# Daily savings summary read from the materialized view; StartDate/EndDate
+# are bound as query parameters
+SAVINGS_VIEW_SUMMARY_QUERY = """
+declare query_parameters(StartDate:datetime, EndDate:datetime);
+//
+{view_name}
+| where ChargeDay >= StartDate and ChargeDay < EndDate
+| project SavingsCategory, ServiceCategory, ChargePeriodStart = ChargeDay, BilledCost, EffectiveCost, ListCost
+| extend 
+    NegotiatedSavings = ListCost - BilledCost,
+    CommitmentSavings = BilledCost - EffectiveCost
+"""
+
+
 def format_query(query: str, start_date: str, end_date: str) -> str:
     """Format a query template with date parameters"""
     return query.format(start_date=start_date, end_date=end_date)
@@ -231,3 +275,37 @@ QUERIES = {
     'subscription_savings': SUBSCRIPTION_SAVINGS_QUERY,
     'top_resources': TOP_RESOURCES_QUERY
 }
+
+
+# Every template filters Costs to the report window with this line; the batch
+# query below replaces that scan with one shared, materialized slice
+_DATE_FILTER = "Costs\n| where ChargePeriodStart >= StartDate and ChargePeriodEnd <= EndDate\n"
+
+# Columns read by any of the QUERIES; the materialized slice keeps only these
+_SLICE_COLUMNS = [
+    'ChargePeriodStart', 'SubAccountId', 'SubAccountName', 'ResourceId', 'ResourceName',
+    'ServiceCategory', 'PricingCategory', 'CommitmentDiscountCategory', 'CommitmentDiscountId',
+    'CommitmentDiscountName', 'x_SkuDetails', 'x_SkuMeterName', 'ListCost', 'BilledCost',
+    'EffectiveCost', 'PricingQuantity', 'ListUnitPrice', 'ContractedUnitPrice'
+]
+
+
+def build_batch_query(names: Optional[List[str]] = None, costs_table: str = "Costs") -> str:
+    """Combine several QUERIES into one batch that scans the date window once
+    
+    StartDate and EndDate are declared as query parameters. The batch returns
+    one primary result per query, in the order of `names` (default: all).
+    """
+    names = list(QUERIES) if names is None else names
+    
+    statements = [
+        "declare query_parameters(StartDate:datetime, EndDate:datetime);",
+        f"let Slice = materialize({costs_table}\n"
+        "| where ChargePeriodStart >= StartDate and ChargePeriodEnd <= EndDate\n"
+        f"| project {', '.join(_SLICE_COLUMNS)});"
+    ]
+    for name in names:
+        body = QUERIES[name].split(_DATE_FILTER, 1)[1]
+        statements.append(f"Slice\n{body.rstrip()};")
+    
+    return "\n".join(statements)
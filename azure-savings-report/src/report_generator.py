@@ -3,45 +3,25 @@ Azure Savings Report - Report Generator
 Generates HTML and Excel reports from savings data
 """
 
+import html
+import json
 import os
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 import pandas as pd
+import xlsxwriter
+from jinja2 import Template
+from markupsafe import Markup
 
 from .savings_calculator import SavingsReport
 
 
-class ReportGenerator:
-    """Generates formatted reports from savings data"""
-    
-    def __init__(self, output_dir: str = "./reports"):
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-    
-    def _format_currency(self, value: float, currency: str = "USD") -> str:
-        """Format a value as currency"""
-        symbols = {"USD": "$", "EUR": "€", "GBP": "£"}
-        symbol = symbols.get(currency, currency + " ")
-        return f"{symbol}{value:,.2f}"
-    
-    def _format_percentage(self, value: float) -> str:
-        """Format a value as percentage"""
-        return f"{value:.1f}%"
-    
-    def generate_html_report(self, report: SavingsReport) -> str:
-        """Generate an HTML report"""
-        
-        html_template = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Azure Savings Report - {report.customer_name}</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-    <style>
-        :root {{
+# Stylesheet and page template are compiled once at import; each report is
+# then a single render pass rather than re-building the whole page.
+_CSS = """\
+        :root {
             --primary-color: #0078d4;
             --secondary-color: #50e6ff;
             --success-color: #107c10;
@@ -49,180 +29,191 @@ class ReportGenerator:
             --card-background: #ffffff;
             --text-color: #323130;
             --border-color: #edebe9;
-        }}
+        }
         
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background-color: var(--background-color);
             color: var(--text-color);
             line-height: 1.6;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             padding: 20px;
-        }}
+        }
         
-        header {{
+        header {
             background: linear-gradient(135deg, var(--primary-color), #005a9e);
             color: white;
             padding: 40px;
             margin-bottom: 30px;
             border-radius: 8px;
-        }}
+        }
         
-        header h1 {{
+        header h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
-        }}
+        }
         
-        header .subtitle {{
+        header .subtitle {
             font-size: 1.2em;
             opacity: 0.9;
-        }}
+        }
         
-        .summary-cards {{
+        .summary-cards {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
             gap: 20px;
             margin-bottom: 30px;
-        }}
+        }
         
-        .card {{
+        .card {
             background: var(--card-background);
             border-radius: 8px;
             padding: 25px;
             box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .card h3 {{
+        .card h3 {
             color: var(--primary-color);
             margin-bottom: 15px;
             font-size: 1.1em;
-        }}
+        }
         
-        .card .value {{
+        .card .value {
             font-size: 2em;
             font-weight: 600;
             color: var(--text-color);
-        }}
+        }
         
-        .card .value.savings {{
+        .card .value.savings {
             color: var(--success-color);
-        }}
+        }
         
-        .card .label {{
+        .card .label {
             color: #605e5c;
             font-size: 0.9em;
             margin-top: 5px;
-        }}
+        }
         
-        .section {{
+        .section {
             background: var(--card-background);
             border-radius: 8px;
             padding: 30px;
             margin-bottom: 30px;
             box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .section h2 {{
+        .section h2 {
             color: var(--primary-color);
             margin-bottom: 20px;
             padding-bottom: 10px;
             border-bottom: 2px solid var(--border-color);
-        }}
+        }
         
-        table {{
+        table {
             width: 100%;
             border-collapse: collapse;
             margin-top: 15px;
-        }}
+        }
         
-        th, td {{
+        th, td {
             padding: 12px;
             text-align: left;
             border-bottom: 1px solid var(--border-color);
-        }}
+        }
         
-        th {{
+        th {
             background-color: #f3f2f1;
             font-weight: 600;
-        }}
+        }
         
-        tr:hover {{
+        tr:hover {
             background-color: #f9f9f9;
-        }}
+        }
         
-        .savings-breakdown {{
+        .savings-breakdown {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 15px;
             margin-top: 20px;
-        }}
+        }
         
-        .breakdown-item {{
+        .breakdown-item {
             background: #f9f9f9;
             padding: 15px;
             border-radius: 6px;
             border-left: 4px solid var(--primary-color);
-        }}
+        }
         
-        .breakdown-item.ri {{ border-left-color: #0078d4; }}
-        .breakdown-item.sp {{ border-left-color: #00b294; }}
-        .breakdown-item.ahb {{ border-left-color: #8764b8; }}
-        .breakdown-item.devtest {{ border-left-color: #ff8c00; }}
-        .breakdown-item.negotiated {{ border-left-color: #107c10; }}
+        .breakdown-item.ri { border-left-color: #0078d4; }
+        .breakdown-item.sp { border-left-color: #00b294; }
+        .breakdown-item.ahb { border-left-color: #8764b8; }
+        .breakdown-item.devtest { border-left-color: #ff8c00; }
+        .breakdown-item.negotiated { border-left-color: #107c10; }
         
-        .chart-container {{
+        .chart-container {
             width: 100%;
             height: 400px;
             margin: 20px 0;
-        }}
+        }
         
-        footer {{
+        footer {
             text-align: center;
             padding: 20px;
             color: #605e5c;
             font-size: 0.9em;
-        }}
+        }
         
-        @media print {{
-            body {{ background: white; }}
-            .card, .section {{ box-shadow: none; border: 1px solid #ddd; }}
-        }}
-    </style>
+        @media print {
+            body { background: white; }
+            .card, .section { box-shadow: none; border: 1px solid #ddd; }
+        }
+"""
+
+_HTML_TEMPLATE = Template("""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Azure Savings Report - {{ report.customer_name }}</title>
+    <script defer src="https://cdn.plot.ly/plotly-basic-2.35.2.min.js"></script>
+    <style>
+""" + _CSS + """    </style>
 </head>
 <body>
     <div class="container">
         <header>
             <h1>Azure Savings Realization Report</h1>
-            <div class="subtitle">{report.customer_name}</div>
-            <div class="subtitle">Period: {report.report_period_start.strftime('%B %d, %Y')} - {report.report_period_end.strftime('%B %d, %Y')}</div>
+            <div class="subtitle">{{ report.customer_name }}</div>
+            <div class="subtitle">Period: {{ period }}</div>
         </header>
         
         <!-- Executive Summary -->
         <div class="summary-cards">
             <div class="card">
                 <h3>Retail (List) Cost</h3>
-                <div class="value">{self._format_currency(report.total_retail_cost, report.currency)}</div>
+                <div class="value">{{ money(report.total_retail_cost) }}</div>
                 <div class="label">What you would pay at public pricing</div>
             </div>
             <div class="card">
                 <h3>Your Effective Cost</h3>
-                <div class="value">{self._format_currency(report.total_effective_cost, report.currency)}</div>
+                <div class="value">{{ money(report.total_effective_cost) }}</div>
                 <div class="label">What you actually paid</div>
             </div>
             <div class="card">
                 <h3>Total Savings</h3>
-                <div class="value savings">{self._format_currency(report.total_savings, report.currency)}</div>
-                <div class="label">{self._format_percentage(report.total_savings_percentage)} savings realized</div>
+                <div class="value savings">{{ money(report.total_savings) }}</div>
+                <div class="label">{{ percent(report.total_savings_percentage) }} savings realized</div>
             </div>
         </div>
         
@@ -232,27 +223,27 @@ class ReportGenerator:
             <div class="savings-breakdown">
                 <div class="breakdown-item negotiated">
                     <h4>Negotiated Discount</h4>
-                    <div class="value">{self._format_currency(report.negotiated_discount_savings.total_savings, report.currency)}</div>
+                    <div class="value">{{ money(report.negotiated_discount_savings.total_savings) }}</div>
                     <div class="label">EA/MCA contract pricing vs retail</div>
                 </div>
                 <div class="breakdown-item ri">
                     <h4>Reserved Instances</h4>
-                    <div class="value">{self._format_currency(report.reserved_instance_savings.total_savings, report.currency)}</div>
-                    <div class="label">{self._format_percentage(report.reserved_instance_savings.savings_percentage)} discount</div>
+                    <div class="value">{{ money(report.reserved_instance_savings.total_savings) }}</div>
+                    <div class="label">{{ percent(report.reserved_instance_savings.savings_percentage) }} discount</div>
                 </div>
                 <div class="breakdown-item sp">
                     <h4>Savings Plans</h4>
-                    <div class="value">{self._format_currency(report.savings_plan_savings.total_savings, report.currency)}</div>
-                    <div class="label">{self._format_percentage(report.savings_plan_savings.savings_percentage)} discount</div>
+                    <div class="value">{{ money(report.savings_plan_savings.total_savings) }}</div>
+                    <div class="label">{{ percent(report.savings_plan_savings.savings_percentage) }} discount</div>
                 </div>
                 <div class="breakdown-item ahb">
                     <h4>Azure Hybrid Benefit</h4>
-                    <div class="value">{self._format_currency(report.ahb_savings.total_savings, report.currency)}</div>
+                    <div class="value">{{ money(report.ahb_savings.total_savings) }}</div>
                     <div class="label">Windows/SQL Server license savings</div>
                 </div>
                 <div class="breakdown-item devtest">
                     <h4>Dev/Test Pricing</h4>
-                    <div class="value">{self._format_currency(report.devtest_savings.total_savings, report.currency)}</div>
+                    <div class="value">{{ money(report.devtest_savings.total_savings) }}</div>
                     <div class="label">Dev/Test subscription discounts</div>
                 </div>
             </div>
@@ -274,7 +265,7 @@ class ReportGenerator:
                     </tr>
                 </thead>
                 <tbody>
-                    {self._generate_service_table_rows(report)}
+                    {{ service_rows }}
                 </tbody>
             </table>
         </div>
@@ -298,97 +289,196 @@ class ReportGenerator:
                     </tr>
                 </thead>
                 <tbody>
-                    {self._generate_resources_table_rows(report)}
+                    {{ resource_rows }}
                 </tbody>
             </table>
         </div>
         
         <footer>
-            <p>Generated on {datetime.now().strftime('%B %d, %Y at %H:%M')} | Azure Savings Report Tool</p>
+            <p>Generated on {{ generated_at }} | Azure Savings Report Tool</p>
         </footer>
     </div>
     
     <script>
-        // Savings Pie Chart
-        var pieData = [{{
-            values: [
-                {report.negotiated_discount_savings.total_savings},
-                {report.reserved_instance_savings.total_savings},
-                {report.savings_plan_savings.total_savings},
-                {report.ahb_savings.total_savings},
-                {report.devtest_savings.total_savings}
-            ],
-            labels: ['Negotiated Discount', 'Reserved Instances', 'Savings Plans', 'Azure Hybrid Benefit', 'Dev/Test Pricing'],
-            type: 'pie',
-            hole: 0.4,
-            marker: {{
-                colors: ['#107c10', '#0078d4', '#00b294', '#8764b8', '#ff8c00']
-            }}
-        }}];
-        
-        var pieLayout = {{
-            title: 'Savings Distribution by Category',
-            showlegend: true,
-            legend: {{ orientation: 'h', y: -0.1 }}
-        }};
-        
-        Plotly.newPlot('savingsPieChart', pieData, pieLayout, {{responsive: true}});
-        
-        // Monthly Trend Chart
-        {self._generate_monthly_chart_data(report)}
+        // Plotly is loaded with defer, so draw once the document has parsed
+        document.addEventListener('DOMContentLoaded', function () {
+            // Savings Pie Chart
+            var pieData = [{
+                values: {{ pie_values }},
+                labels: {{ pie_labels }},
+                type: 'pie',
+                hole: 0.4,
+                marker: {
+                    colors: {{ pie_colors }}
+                }
+            }];
+        
+            var pieLayout = {
+                title: 'Savings Distribution by Category',
+                showlegend: true,
+                legend: { orientation: 'h', y: -0.1 }
+            };
+        
+            Plotly.newPlot('savingsPieChart', pieData, pieLayout, {responsive: true});
+        
+            // Monthly Trend Chart
+            {{ monthly_chart }}
+        });
     </script>
 </body>
 </html>
-"""
+""", keep_trailing_newline=True, autoescape=True)
+
+
+_CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€", "GBP": "£"}
+
+# xlsxwriter Formats belong to a single Workbook, so the shared pieces are
+# the property dicts; each is turned into a Format once per workbook
+_DATA_HEADER_STYLE = {'bold': True, 'border': 1}
+_DATA_MONEY_STYLE = {'num_format': '$#,##0.00'}
+_REPORT_TITLE_STYLE = {'bold': True, 'font_size': 20, 'font_color': '#0078D4'}
+_CUSTOMER_STYLE = {'font_size': 14}
+_PERIOD_STYLE = {'font_size': 12, 'italic': True}
+_CHARTS_HEADER_STYLE = {'bold': True, 'font_size': 14, 'font_color': '#FFFFFF', 'bg_color': '#0078D4'}
+_CHARTS_TITLE_STYLE = {'bold': True, 'font_size': 16, 'font_color': '#0078D4'}
+_CELL_STYLE = {'border': 1}
+_MONEY_CELL_STYLE = {'border': 1, 'num_format': '$#,##0'}
+_PERCENT_CELL_STYLE = {'border': 1, 'num_format': '0.0%'}
+_CARD_LABEL_STYLE = {'bold': True, 'font_size': 10, 'align': 'center'}
+_CARD_VALUE_STYLE = {'bold': True, 'font_size': 14, 'align': 'center'}
+
+# Savings categories in the order both reports chart them
+_SAVINGS_CATEGORIES = (
+    ('Negotiated Discount', 'negotiated_discount_savings', '107C10'),
+    ('Reserved Instances', 'reserved_instance_savings', '0078D4'),
+    ('Savings Plans', 'savings_plan_savings', '00B294'),
+    ('Azure Hybrid Benefit', 'ahb_savings', '8764B8'),
+    ('Dev/Test Pricing', 'devtest_savings', 'FF8C00'),
+)
+
+_SERVICE_ROW = ('<tr><td>{}</td><td>{}</td><td>{}</td>'
+                '<td>{}</td><td>{}</td></tr>')
+
+_RESOURCE_ROW = '<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>'
+
+_EMPTY_ROW = '<tr><td colspan="{}">No data</td></tr>'
+
+# Keeps joined rows aligned with the <tbody> they are rendered into
+_ROW_SEPARATOR = '\n' + ' ' * 20
+
+
+class ReportGenerator:
+    """Generates formatted reports from savings data"""
+    
+    # Large enough that a typical report reaches disk in a single write
+    HTML_WRITE_BUFFER = 1 << 16
+    
+    def __init__(self, output_dir: str = "./reports"):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def _format_currency(value: float, currency: str = "USD") -> str:
+        """Format a value as currency"""
+        return f"{_CURRENCY_SYMBOLS.get(currency, currency + ' ')}{value:,.2f}"
+    
+    @staticmethod
+    def _currency_formatter(currency: str):
+        """Return a formatter with the currency symbol resolved up front"""
+        symbol = _CURRENCY_SYMBOLS.get(currency, currency + " ")
+        return lambda value: f"{symbol}{value:,.2f}"
+    
+    def _format_percentage(self, value: float) -> str:
+        """Format a value as percentage"""
+        return f"{value:.1f}%"
+    
+    @staticmethod
+    def _category_savings(report: SavingsReport):
+        """(label, total savings, color) for each savings category, in chart order"""
+        return [(label, getattr(report, attr).total_savings, color) for label, attr, color in _SAVINGS_CATEGORIES]
+    
+    @staticmethod
+    def _format_period(report: SavingsReport) -> str:
+        """Format the report period for page and sheet headings"""
+        return f"{report.report_period_start:%B %d, %Y} - {report.report_period_end:%B %d, %Y}"
+    
+    def generate_html_report(self, report: SavingsReport) -> str:
+        """Generate an HTML report"""
         
-        # Save the report
-        filename = f"savings_report_{report.customer_name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.html"
+        now = datetime.now()
+        filename = f"savings_report_{report.customer_name.replace(' ', '_')}_{now.strftime('%Y%m%d')}.html"
         filepath = self.output_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_template)
+        # Render section by section straight into the file rather than
+        # building the whole document as one string first. The template
+        # autoescapes, so fragments built here are passed as Markup; their
+        # text cells are escaped as the rows are assembled
+        # Pie labels, values and colors all come from _SAVINGS_CATEGORIES
+        labels, values, colors = zip(*self._category_savings(report))
+        stream = _HTML_TEMPLATE.stream(
+            report=report,
+            money=self._currency_formatter(report.currency),
+            percent=self._format_percentage,
+            pie_labels=Markup(json.dumps(labels)),
+            pie_values=Markup(json.dumps([float(value) for value in values])),
+            pie_colors=Markup(json.dumps([f'#{color.lower()}' for color in colors])),
+            service_rows=Markup(self._generate_service_table_rows(report)),
+            resource_rows=Markup(self._generate_resources_table_rows(report)),
+            monthly_chart=Markup(self._generate_monthly_chart_data(report)),
+            period=self._format_period(report),
+            generated_at=now.strftime('%B %d, %Y at %H:%M'),
+        )
+        with open(filepath, 'w', encoding='utf-8', buffering=self.HTML_WRITE_BUFFER) as f:
+            stream.dump(f)
         
         return str(filepath)
     
+    def generate_all(self, report: SavingsReport) -> Tuple[str, str]:
+        """Generate the HTML and Excel reports concurrently, returning (html_path, excel_path)"""
+        # The two writers only read the report, and each spends much of its
+        # time in file and zlib I/O that releases the GIL
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            html_future = executor.submit(self.generate_html_report, report)
+            excel_future = executor.submit(self.generate_excel_report, report)
+            return html_future.result(), excel_future.result()
+    
     def _generate_service_table_rows(self, report: SavingsReport) -> str:
         """Generate table rows for services"""
-        rows = []
-        for _, row in report.savings_by_service.head(15).iterrows():
-            rows.append(f"""
-                <tr>
-                    <td>{row['ServiceCategory']}</td>
-                    <td>{self._format_currency(row['ListCost'], report.currency)}</td>
-                    <td>{self._format_currency(row['EffectiveCost'], report.currency)}</td>
-                    <td>{self._format_currency(row['TotalSavings'], report.currency)}</td>
-                    <td>{self._format_percentage(row['SavingsPercentage'])}</td>
-                </tr>
-            """)
-        return '\n'.join(rows)
+        if report.savings_by_service.empty:
+            return _EMPTY_ROW.format(5)
+        money = self._currency_formatter(report.currency)
+        columns = ['ServiceCategory', 'ListCost', 'EffectiveCost', 'TotalSavings', 'SavingsPercentage']
+        return _ROW_SEPARATOR.join(
+            _SERVICE_ROW.format(html.escape(str(service)), money(list_cost), money(effective_cost), money(savings), f"{pct:.1f}%")
+            for service, list_cost, effective_cost, savings, pct
+            in report.savings_by_service.head(15)[columns].itertuples(index=False, name=None)
+        )
     
     def _generate_resources_table_rows(self, report: SavingsReport) -> str:
         """Generate table rows for top resources"""
-        rows = []
-        for _, row in report.top_savings_resources.head(10).iterrows():
-            resource_name = row['ResourceName'] if len(str(row['ResourceName'])) < 50 else str(row['ResourceName'])[:47] + '...'
-            rows.append(f"""
-                <tr>
-                    <td>{resource_name}</td>
-                    <td>{row['ServiceCategory']}</td>
-                    <td>{row['SavingsCategory']}</td>
-                    <td>{self._format_currency(row['TotalSavings'], report.currency)}</td>
-                </tr>
-            """)
-        return '\n'.join(rows)
+        if report.top_savings_resources.empty:
+            return _EMPTY_ROW.format(4)
+        money = self._currency_formatter(report.currency)
+        top = report.top_savings_resources.head(10)
+        names = top['ResourceName'].astype(str)
+        names = names.where(names.str.len() < 50, names.str[:47] + '...')
+        return _ROW_SEPARATOR.join(
+            _RESOURCE_ROW.format(html.escape(name), html.escape(str(service)), html.escape(str(category)), money(savings))
+            for name, service, category, savings
+            in zip(names, top['ServiceCategory'], top['SavingsCategory'], top['TotalSavings'])
+        )
     
     def _generate_monthly_chart_data(self, report: SavingsReport) -> str:
         """Generate JavaScript for monthly trend chart"""
         if report.monthly_trend.empty:
             return "// No monthly data available"
         
-        months = report.monthly_trend['Month'].tolist()
-        retail = report.monthly_trend['ListCost'].tolist()
-        effective = report.monthly_trend['EffectiveCost'].tolist()
-        savings = report.monthly_trend['TotalSavings'].tolist()
+        trend = report.monthly_trend
+        months = json.dumps(trend['Month'].astype(str).tolist())
+        retail, effective, savings = (
+            json.dumps(values)
+            for values in trend[['ListCost', 'EffectiveCost', 'TotalSavings']].to_numpy(dtype=float).T.tolist()
+        )
         
         return f"""
         var monthlyData = [
@@ -434,17 +524,16 @@ class ReportGenerator:
     
     def generate_excel_report(self, report: SavingsReport) -> str:
         """Generate an Excel report with charts"""
-        from openpyxl.chart import PieChart, BarChart, LineChart, Reference
-        from openpyxl.chart.label import DataLabelList
-        from openpyxl.chart.series import DataPoint
-        from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-        from openpyxl.utils.dataframe import dataframe_to_rows
-        from openpyxl.drawing.fill import PatternFillProperties, ColorChoice
-        
-        filename = f"savings_report_{report.customer_name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.xlsx"
+        filename = f"savings_report_{report.customer_name.replace(' ', '_')}_{date.today():%Y%m%d}.xlsx"
         filepath = self.output_dir / filename
         
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+        # constant_memory flushes each row as soon as the next one starts, so
+        # every sheet below is written strictly top to bottom
+        workbook = xlsxwriter.Workbook(str(filepath), {'constant_memory': True})
+        try:
+            header_format = workbook.add_format(_DATA_HEADER_STYLE)
+            money_format = workbook.add_format(_DATA_MONEY_STYLE)
+            
             # Executive Summary
             summary_data = {
                 'Metric': [
@@ -484,63 +573,82 @@ class ReportGenerator:
                     report.devtest_savings.total_savings
                 ]
             }
-            pd.DataFrame(summary_data).to_excel(writer, sheet_name='Executive Summary', index=False)
+            self._write_dataframe_sheet(workbook, 'Executive Summary', pd.DataFrame(summary_data), header_format)
             
             # Savings by Service
-            report.savings_by_service.to_excel(writer, sheet_name='By Service', index=False)
+            if not report.savings_by_service.empty:
+                self._write_dataframe_sheet(workbook, 'By Service', report.savings_by_service, header_format, money_format)
             
             # Savings by Subscription
-            report.savings_by_subscription.to_excel(writer, sheet_name='By Subscription', index=False)
+            if not report.savings_by_subscription.empty:
+                self._write_dataframe_sheet(workbook, 'By Subscription', report.savings_by_subscription, header_format, money_format)
             
             # Monthly Trend
             if not report.monthly_trend.empty:
-                report.monthly_trend.to_excel(writer, sheet_name='Monthly Trend', index=False)
+                self._write_dataframe_sheet(workbook, 'Monthly Trend', report.monthly_trend, header_format, money_format)
             
             # Top Resources
-            report.top_savings_resources.to_excel(writer, sheet_name='Top Resources', index=False)
+            if not report.top_savings_resources.empty:
+                self._write_dataframe_sheet(workbook, 'Top Resources', report.top_savings_resources, header_format, money_format)
             
             # Create Charts sheet with data and visualizations
-            self._create_charts_sheet(writer, report)
+            self._create_charts_sheet(workbook, report)
+        finally:
+            workbook.close()
         
         return str(filepath)
     
-    def _create_charts_sheet(self, writer, report: SavingsReport):
+    def _write_dataframe_sheet(self, workbook, sheet_name: str, df: pd.DataFrame, header_format, money_format=None):
+        """Write a DataFrame to its own sheet row by row, header first"""
+        ws = workbook.add_worksheet(sheet_name)
+        ws.write_row(0, 0, [str(col) for col in df.columns], header_format)
+        
+        # Cost and savings columns share one column-level format, which
+        # xlsxwriter applies to every unformatted cell written below it
+        if money_format is not None:
+            for idx, col in enumerate(df.columns):
+                if str(col).endswith(('Cost', 'Savings')) and pd.api.types.is_numeric_dtype(df[col]):
+                    ws.set_column(idx, idx, None, money_format)
+        
+        # Convert column by column to plain Python values, with missing cells
+        # as None which xlsxwriter leaves blank
+        columns = [df[col].to_numpy(dtype=object, na_value=None) for col in df.columns]
+        for r, row in enumerate(zip(*columns), start=1):
+            ws.write_row(r, 0, row)
+    
+    def _create_charts_sheet(self, workbook, report: SavingsReport):
         """Create a Charts sheet with visualizations similar to HTML report"""
-        from openpyxl.chart import PieChart, BarChart, Reference
-        from openpyxl.chart.label import DataLabelList
-        from openpyxl.chart.series import DataPoint
-        from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-        from openpyxl.utils import get_column_letter
-        
-        workbook = writer.book
-        ws = workbook.create_sheet('Charts')
+        ws = workbook.add_worksheet('Charts')
         
         # Define styles
-        header_font = Font(bold=True, size=14, color="FFFFFF")
-        header_fill = PatternFill(start_color="0078D4", end_color="0078D4", fill_type="solid")
-        title_font = Font(bold=True, size=16, color="0078D4")
-        money_font = Font(bold=True, size=12)
-        savings_font = Font(bold=True, size=14, color="107C10")
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
+        header_format = workbook.add_format(_CHARTS_HEADER_STYLE)
+        title_format = workbook.add_format(_CHARTS_TITLE_STYLE)
+        cell_format = workbook.add_format(_CELL_STYLE)
+        money_format = workbook.add_format(_MONEY_CELL_STYLE)
+        percent_format = workbook.add_format(_PERCENT_CELL_STYLE)
+        card_label_format = workbook.add_format(_CARD_LABEL_STYLE)
+        card_value_formats = {}
+        
+        def card_value_format(color, num_format='"$"#,##0'):
+            key = (color, num_format)
+            if key not in card_value_formats:
+                card_value_formats[key] = workbook.add_format(
+                    {**_CARD_VALUE_STYLE, 'font_color': f'#{color}', 'num_format': num_format}
+                )
+            return card_value_formats[key]
         
         # ============ EXECUTIVE SUMMARY SECTION ============
-        ws['A1'] = 'AZURE SAVINGS REALIZATION REPORT'
-        ws['A1'].font = Font(bold=True, size=20, color="0078D4")
-        ws.merge_cells('A1:F1')
-        
-        ws['A2'] = report.customer_name
-        ws['A2'].font = Font(size=14)
-        
-        ws['A3'] = f"Period: {report.report_period_start.strftime('%B %d, %Y')} - {report.report_period_end.strftime('%B %d, %Y')}"
-        ws['A3'].font = Font(size=12, italic=True)
+        ws.merge_range(0, 0, 0, 5, 'AZURE SAVINGS REALIZATION REPORT',
+                       workbook.add_format(_REPORT_TITLE_STYLE))
+        ws.write(1, 0, report.customer_name, workbook.add_format(_CUSTOMER_STYLE))
+        ws.write(
+            2, 0,
+            f"Period: {self._format_period(report)}",
+            workbook.add_format(_PERIOD_STYLE)
+        )
         
         # Summary Cards Row
-        row = 5
+        row = 4
         cards = [
             ('Retail (List) Cost', report.total_retail_cost, 'D13438'),
             ('Negotiated Cost', report.total_negotiated_cost, '0078D4'),
@@ -548,188 +656,109 @@ class ReportGenerator:
             ('Total Savings', report.total_savings, '107C10'),
         ]
         
-        for col_idx, (label, value, color) in enumerate(cards, start=1):
-            col = get_column_letter(col_idx * 2 - 1)
-            ws[f'{col}{row}'] = label
-            ws[f'{col}{row}'].font = Font(bold=True, size=10)
-            ws[f'{col}{row}'].alignment = Alignment(horizontal='center')
-            
-            ws[f'{col}{row+1}'] = f"${value:,.0f}"
-            ws[f'{col}{row+1}'].font = Font(bold=True, size=14, color=color)
-            ws[f'{col}{row+1}'].alignment = Alignment(horizontal='center')
-        
+        for col_idx, (label, value, color) in enumerate(cards):
+            ws.write(row, col_idx * 2, label, card_label_format)
         # Savings percentage
-        ws['I5'] = 'Savings %'
-        ws['I5'].font = Font(bold=True, size=10)
-        ws['I5'].alignment = Alignment(horizontal='center')
-        ws['I6'] = f"{report.total_savings_percentage:.1f}%"
-        ws['I6'].font = Font(bold=True, size=14, color="107C10")
-        ws['I6'].alignment = Alignment(horizontal='center')
+        ws.write(row, 8, 'Savings %', card_label_format)
+        
+        for col_idx, (label, value, color) in enumerate(cards):
+            ws.write_number(row + 1, col_idx * 2, value, card_value_format(color))
+        ws.write_number(row + 1, 8, report.total_savings_percentage / 100, card_value_format('107C10', '0.0%'))
         
         # ============ SAVINGS BY CATEGORY (PIE CHART DATA) ============
-        row = 9
-        ws[f'A{row}'] = 'SAVINGS BY CATEGORY'
-        ws[f'A{row}'].font = title_font
+        ws.write(8, 0, 'SAVINGS BY CATEGORY', title_format)
         
         # Category data for pie chart
-        categories = [
-            ('Negotiated Discount', report.negotiated_discount_savings.total_savings, '107C10'),
-            ('Reserved Instances', report.reserved_instance_savings.total_savings, '0078D4'),
-            ('Savings Plans', report.savings_plan_savings.total_savings, '00B294'),
-            ('Azure Hybrid Benefit', report.ahb_savings.total_savings, '8764B8'),
-            ('Dev/Test Pricing', report.devtest_savings.total_savings, 'FF8C00'),
-        ]
+        categories = self._category_savings(report)
         
         # Write category data
-        row = 11
-        ws[f'A{row}'] = 'Category'
-        ws[f'B{row}'] = 'Savings'
-        ws[f'C{row}'] = 'Percentage'
-        ws[f'A{row}'].font = header_font
-        ws[f'B{row}'].font = header_font
-        ws[f'C{row}'].font = header_font
-        ws[f'A{row}'].fill = header_fill
-        ws[f'B{row}'].fill = header_fill
-        ws[f'C{row}'].fill = header_fill
-        
-        total_cat_savings = sum(c[1] for c in categories)
+        row = 10
+        ws.write_row(row, 0, ['Category', 'Savings', 'Percentage'], header_format)
+        
+        total_cat_savings = sum(value for _, value, _ in categories)
         for i, (name, value, color) in enumerate(categories, start=1):
-            r = row + i
-            ws[f'A{r}'] = name
-            ws[f'B{r}'] = value
-            pct = (value / total_cat_savings * 100) if total_cat_savings > 0 else 0
-            ws[f'C{r}'] = f"{pct:.1f}%"
-            ws[f'A{r}'].border = thin_border
-            ws[f'B{r}'].border = thin_border
-            ws[f'C{r}'].border = thin_border
-            ws[f'B{r}'].number_format = '$#,##0'
+            share = (value / total_cat_savings) if total_cat_savings > 0 else 0
+            ws.write(row + i, 0, name, cell_format)
+            ws.write_number(row + i, 1, value, money_format)
+            ws.write_number(row + i, 2, share, percent_format)
         
         # Create Pie Chart
-        pie = PieChart()
-        pie.title = "Savings Distribution by Category"
-        labels = Reference(ws, min_col=1, min_row=row+1, max_row=row+5)
-        data = Reference(ws, min_col=2, min_row=row, max_row=row+5)
-        pie.add_data(data, titles_from_data=True)
-        pie.set_categories(labels)
-        pie.width = 15
-        pie.height = 10
-        
-        # Set custom colors for pie slices
-        colors = ['107C10', '0078D4', '00B294', '8764B8', 'FF8C00']
-        for i, color in enumerate(colors):
-            pt = DataPoint(idx=i)
-            pt.graphicalProperties.solidFill = color
-            pie.series[0].data_points.append(pt)
-        
-        pie.dataLabels = DataLabelList()
-        pie.dataLabels.showPercent = True
-        pie.dataLabels.showCatName = True
-        pie.dataLabels.showVal = False
-        
-        ws.add_chart(pie, "E10")
+        pie = workbook.add_chart({'type': 'pie'})
+        pie.set_title({'name': 'Savings Distribution by Category'})
+        pie.add_series({
+            'name': ['Charts', row, 1],
+            'categories': ['Charts', row + 1, 0, row + 5, 0],
+            'values': ['Charts', row + 1, 1, row + 5, 1],
+            'points': [{'fill': {'color': f'#{color}'}} for _, _, color in categories],
+            'data_labels': {'percentage': True, 'category': True},
+        })
+        pie.set_size({'width': 567, 'height': 378})
+        ws.insert_chart('E10', pie)
         
         # ============ SAVINGS BY SERVICE (BAR CHART) ============
-        row = 23
-        ws[f'A{row}'] = 'TOP SERVICES BY SAVINGS'
-        ws[f'A{row}'].font = title_font
+        ws.write(22, 0, 'TOP SERVICES BY SAVINGS', title_format)
         
         # Write service data (top 10)
-        row = 25
-        ws[f'A{row}'] = 'Service'
-        ws[f'B{row}'] = 'Retail Cost'
-        ws[f'C{row}'] = 'Effective Cost'
-        ws[f'D{row}'] = 'Savings'
-        for col in ['A', 'B', 'C', 'D']:
-            ws[f'{col}{row}'].font = header_font
-            ws[f'{col}{row}'].fill = header_fill
+        row = 24
+        ws.write_row(row, 0, ['Service', 'Retail Cost', 'Effective Cost', 'Savings'], header_format)
         
         top_services = report.savings_by_service.head(10)
-        for i, (_, svc_row) in enumerate(top_services.iterrows(), start=1):
-            r = row + i
-            ws[f'A{r}'] = svc_row.get('ServiceCategory', 'Unknown')
-            ws[f'B{r}'] = svc_row.get('ListCost', 0)
-            ws[f'C{r}'] = svc_row.get('EffectiveCost', 0)
-            ws[f'D{r}'] = svc_row.get('TotalSavings', 0)
-            for col in ['A', 'B', 'C', 'D']:
-                ws[f'{col}{r}'].border = thin_border
-            ws[f'B{r}'].number_format = '$#,##0'
-            ws[f'C{r}'].number_format = '$#,##0'
-            ws[f'D{r}'].number_format = '$#,##0'
-        
-        # Create Bar Chart for services
-        bar = BarChart()
-        bar.type = "col"
-        bar.title = "Savings by Service"
-        bar.y_axis.title = "Amount ($)"
-        bar.x_axis.title = "Service"
-        bar.width = 18
-        bar.height = 10
-        
-        data_end_row = row + min(len(top_services), 10)
-        data = Reference(ws, min_col=4, min_row=row, max_row=data_end_row)
-        cats = Reference(ws, min_col=1, min_row=row+1, max_row=data_end_row)
-        bar.add_data(data, titles_from_data=True)
-        bar.set_categories(cats)
-        bar.shape = 4
-        bar.series[0].graphicalProperties.solidFill = "107C10"
-        
-        ws.add_chart(bar, "F24")
+        service_rows = top_services.reindex(columns=['ServiceCategory', 'ListCost', 'EffectiveCost', 'TotalSavings'])
+        service_rows = service_rows.fillna({'ServiceCategory': 'Unknown', 'ListCost': 0, 'EffectiveCost': 0, 'TotalSavings': 0})
+        for i, (service, *amounts) in enumerate(service_rows.itertuples(index=False, name=None), start=1):
+            ws.write(row + i, 0, service, cell_format)
+            ws.write_row(row + i, 1, amounts, money_format)
+        
+        if not top_services.empty:
+            # Create Bar Chart for services
+            bar = workbook.add_chart({'type': 'column'})
+            bar.set_title({'name': 'Savings by Service'})
+            bar.set_y_axis({'name': 'Amount ($)'})
+            bar.set_x_axis({'name': 'Service'})
+            bar.set_size({'width': 680, 'height': 378})
+            
+            data_end_row = row + min(len(top_services), 10)
+            bar.add_series({
+                'name': ['Charts', row, 3],
+                'categories': ['Charts', row + 1, 0, data_end_row, 0],
+                'values': ['Charts', row + 1, 3, data_end_row, 3],
+                'fill': {'color': '#107C10'},
+            })
+            ws.insert_chart('F24', bar)
         
         # ============ MONTHLY TREND (IF DATA EXISTS) ============
         if not report.monthly_trend.empty:
-            row = 40
-            ws[f'A{row}'] = 'MONTHLY TREND'
-            ws[f'A{row}'].font = title_font
+            ws.write(39, 0, 'MONTHLY TREND', title_format)
             
             # Write monthly data
-            row = 42
-            ws[f'A{row}'] = 'Month'
-            ws[f'B{row}'] = 'Retail Cost'
-            ws[f'C{row}'] = 'Effective Cost'
-            ws[f'D{row}'] = 'Savings'
-            for col in ['A', 'B', 'C', 'D']:
-                ws[f'{col}{row}'].font = header_font
-                ws[f'{col}{row}'].fill = header_fill
+            row = 41
+            ws.write_row(row, 0, ['Month', 'Retail Cost', 'Effective Cost', 'Savings'], header_format)
             
-            for i, (_, m_row) in enumerate(report.monthly_trend.iterrows(), start=1):
-                r = row + i
-                ws[f'A{r}'] = m_row.get('Month', '')
-                ws[f'B{r}'] = m_row.get('ListCost', 0)
-                ws[f'C{r}'] = m_row.get('EffectiveCost', 0)
-                ws[f'D{r}'] = m_row.get('TotalSavings', 0)
-                for col in ['A', 'B', 'C', 'D']:
-                    ws[f'{col}{r}'].border = thin_border
-                ws[f'B{r}'].number_format = '$#,##0'
-                ws[f'C{r}'].number_format = '$#,##0'
-                ws[f'D{r}'].number_format = '$#,##0'
+            monthly_rows = report.monthly_trend.reindex(columns=['Month', 'ListCost', 'EffectiveCost', 'TotalSavings'])
+            monthly_rows = monthly_rows.fillna({'Month': '', 'ListCost': 0, 'EffectiveCost': 0, 'TotalSavings': 0})
+            for i, (month, *amounts) in enumerate(monthly_rows.itertuples(index=False, name=None), start=1):
+                ws.write(row + i, 0, month, cell_format)
+                ws.write_row(row + i, 1, amounts, money_format)
             
-            # Create combined bar + line chart for monthly trend
-            monthly_bar = BarChart()
-            monthly_bar.type = "col"
-            monthly_bar.title = "Monthly Cost and Savings Trend"
-            monthly_bar.y_axis.title = "Cost ($)"
-            monthly_bar.width = 18
-            monthly_bar.height = 10
+            # Create combined bar chart for monthly trend
+            monthly_bar = workbook.add_chart({'type': 'column'})
+            monthly_bar.set_title({'name': 'Monthly Cost and Savings Trend'})
+            monthly_bar.set_y_axis({'name': 'Cost ($)'})
+            monthly_bar.set_size({'width': 680, 'height': 378})
             
             data_end_row = row + len(report.monthly_trend)
             
             # Retail and Effective cost bars
-            retail_data = Reference(ws, min_col=2, min_row=row, max_row=data_end_row)
-            effective_data = Reference(ws, min_col=3, min_row=row, max_row=data_end_row)
-            cats = Reference(ws, min_col=1, min_row=row+1, max_row=data_end_row)
-            
-            monthly_bar.add_data(retail_data, titles_from_data=True)
-            monthly_bar.add_data(effective_data, titles_from_data=True)
-            monthly_bar.set_categories(cats)
-            
-            monthly_bar.series[0].graphicalProperties.solidFill = "D13438"
-            monthly_bar.series[1].graphicalProperties.solidFill = "0078D4"
+            for col, color in ((1, '#D13438'), (2, '#0078D4')):
+                monthly_bar.add_series({
+                    'name': ['Charts', row, col],
+                    'categories': ['Charts', row + 1, 0, data_end_row, 0],
+                    'values': ['Charts', row + 1, col, data_end_row, col],
+                    'fill': {'color': color},
+                })
             
-            ws.add_chart(monthly_bar, "F41")
+            ws.insert_chart('F41', monthly_bar)
         
         # ============ ADJUST COLUMN WIDTHS ============
-        ws.column_dimensions['A'].width = 25
-        ws.column_dimensions['B'].width = 15
-        ws.column_dimensions['C'].width = 15
-        ws.column_dimensions['D'].width = 15
-        ws.column_dimensions['E'].width = 15
+        ws.set_column(0, 0, 25)
+        ws.set_column(1, 4, 15)
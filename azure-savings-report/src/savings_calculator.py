@@ -8,6 +8,52 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+
+
+# SavingsCategory values, in _categorize_savings' condition order with the
+# default last
+_SAVINGS_CATEGORIES = ['Reserved Instance', 'Savings Plan', 'Azure Hybrid Benefit', 'Dev/Test Pricing', 'Negotiated Rate']
+
+# Low-cardinality columns the calculator filters and groups on
+_GROUPING_COLUMNS = ('ServiceCategory', 'SubAccountId', 'SubAccountName')
+
+# High-cardinality string keys of the top resources breakdown
+_RESOURCE_COLUMNS = ('ResourceId', 'ResourceName')
+
+
+# Cost columns summed by every breakdown; savings are derived after grouping
+_COST_COLUMNS = ['ListCost', 'BilledCost', 'EffectiveCost']
+
+
+def _with_savings(df: pd.DataFrame) -> pd.DataFrame:
+    """Add savings columns to a frame of summed costs (sum(a - b) == sum(a) - sum(b))"""
+    df['NegotiatedSavings'] = df['ListCost'] - df['BilledCost']
+    df['CommitmentSavings'] = df['BilledCost'] - df['EffectiveCost']
+    df['TotalSavings'] = df['ListCost'] - df['EffectiveCost']
+    return df
+
+
+def _savings_percentage(savings: pd.Series, retail: pd.Series) -> np.ndarray:
+    """Vectorized savings / retail * 100 (rounded to 2dp), 0 where there is no retail cost"""
+    savings = savings.to_numpy(dtype=np.float64, copy=False)
+    retail = retail.to_numpy(dtype=np.float64, copy=False)
+    pct = np.divide(savings, retail, out=np.zeros_like(savings), where=retail > 0)
+    return np.round(pct * 100.0, 2)
+
+
+def _top_n(df: pd.DataFrame, column: str, n: int) -> pd.DataFrame:
+    """Rows with the n largest values of column, descending, without sorting the whole frame"""
+    values = df[column].to_numpy(dtype=np.float64)
+    if n <= 0:
+        return df.iloc[:0]
+    if n < len(values):
+        # O(len) partial selection, then order just the n winners
+        idx = np.argpartition(-values, n - 1)[:n]
+    else:
+        idx = np.arange(len(values))
+    idx = idx[np.argsort(-values[idx], kind='stable')]
+    return df.iloc[idx]
 
 
 @dataclass
@@ -62,7 +108,10 @@ class SavingsCalculator:
     
     def _prepare_data(self):
         """Prepare and normalize the cost data"""
-        df = self.costs_df.copy()
+        # Only columns are added or replaced below, so a shallow copy keeps
+        # the caller's (possibly cached) frame untouched without duplicating
+        # its data
+        df = self.costs_df.copy(deep=False)
         
         # Ensure required columns exist with defaults
         required_columns = {
@@ -76,113 +125,133 @@ class SavingsCalculator:
             'ResourceName': 'Unknown'
         }
         
+        # Missing text columns become a single-category categorical (one
+        # int8 code per row instead of a repeated Python string) and missing
+        # costs a contiguous float64 array
         for col, default in required_columns.items():
             if col not in df.columns:
-                df[col] = default
-        
-        # Calculate derived columns
-        df['NegotiatedSavings'] = df['ListCost'] - df['BilledCost']
-        df['CommitmentSavings'] = df['BilledCost'] - df['EffectiveCost']
-        df['TotalSavings'] = df['ListCost'] - df['EffectiveCost']
+                if isinstance(default, str):
+                    codes = np.zeros(len(df), dtype=np.int8)
+                    df[col] = pd.Categorical.from_codes(codes, categories=[default])
+                else:
+                    df[col] = np.full(len(df), default, dtype=np.float64)
         
         # Categorize savings
-        df['SavingsCategory'] = df.apply(self._categorize_savings, axis=1)
+        df['SavingsCategory'] = self._categorize_savings(df)
+        
+        # Filters and groupbys below then compare integer codes instead of
+        # hashing strings; a no-op for columns the data source already
+        # loaded as categoricals
+        for col in _GROUPING_COLUMNS:
+            if col not in df.columns or isinstance(df[col].dtype, pd.CategoricalDtype):
+                continue
+            dtype = df[col].dtype
+            if isinstance(dtype, pd.ArrowDtype) and pa.types.is_dictionary(dtype.pyarrow_dtype):
+                # astype('category') cannot read Arrow dictionary columns
+                # that contain nulls; decode to the plain value type first
+                df[col] = df[col].astype(pd.ArrowDtype(dtype.pyarrow_dtype.value_type))
+            df[col] = df[col].astype('category')
+        
+        # Resource keys are too distinct for categoricals; Arrow strings
+        # factorize faster than Python objects and store UTF-8 contiguously
+        for col in _RESOURCE_COLUMNS:
+            if col in df.columns and df[col].dtype == object:
+                df[col] = df[col].astype('string[pyarrow]')
+        
+        # Month key parsed once for every monthly trend calculation, as a
+        # plain year * 12 + month - 1 ordinal that groups like Period[M]
+        # without building a PeriodArray
+        self._months = None
+        if 'ChargePeriodStart' in df.columns:
+            charge_start = pd.to_datetime(df['ChargePeriodStart'])
+            self._months = (charge_start.dt.year * 12 + charge_start.dt.month - 1).rename('Month')
         
         self.costs_df = df
+        self._category_totals = None
     
-    def _categorize_savings(self, row) -> str:
-        """Categorize the type of savings for a row"""
-        pricing_category = str(row.get('PricingCategory', '')).lower()
-        commitment_category = str(row.get('CommitmentDiscountCategory', '')).lower()
-        sku_details = str(row.get('x_SkuDetails', '')).lower()
-        sub_name = str(row.get('SubAccountName', '')).lower()
-        
-        if pricing_category == 'committed':
-            if commitment_category == 'usage':
-                return 'Reserved Instance'
-            elif commitment_category == 'spend':
-                return 'Savings Plan'
-        
-        if 'ahb' in sku_details or 'hybridbenefit' in sku_details or 'hybrid benefit' in sku_details:
-            return 'Azure Hybrid Benefit'
-        
-        if 'devtest' in sub_name or 'dev/test' in sub_name or 'dev-test' in sub_name:
-            return 'Dev/Test Pricing'
-        
-        return 'Negotiated Rate'
+    def _category_sums(self) -> pd.DataFrame:
+        """ListCost, BilledCost and EffectiveCost summed per SavingsCategory"""
+        # One grouped pass serves all five category summaries and the report
+        # totals; observed=False keeps categories with no rows as zero sums
+        if self._category_totals is None:
+            self._category_totals = self.costs_df.groupby('SavingsCategory', observed=False)[_COST_COLUMNS].sum()
+        return self._category_totals
     
-    def calculate_negotiated_discount_savings(self) -> SavingsSummary:
-        """Calculate savings from EA/MCA negotiated discounts"""
-        # Filter for standard pricing (not commitment-based)
-        df = self.costs_df[self.costs_df['SavingsCategory'] == 'Negotiated Rate']
-        
-        retail_cost = df['ListCost'].sum()
-        negotiated_cost = df['BilledCost'].sum()
-        effective_cost = df['EffectiveCost'].sum()
+    def _category_costs(self, category: str):
+        """(ListCost, BilledCost, EffectiveCost) sums for one SavingsCategory"""
+        row = self._category_sums().loc[category]
+        return row['ListCost'], row['BilledCost'], row['EffectiveCost']
+    
+    def _categorize_savings(self, df: pd.DataFrame) -> pd.Categorical:
+        """Categorize the type of savings for every row at once"""
+        def matches(col: str, test) -> np.ndarray:
+            # These columns hold few distinct values, so run the string test
+            # once per distinct lower-cased value and broadcast it by code
+            if col not in df.columns:
+                return np.zeros(len(df), dtype=bool)
+            values = df[col]
+            if values.dtype == object:
+                # Kusto dynamic columns (e.g. x_SkuDetails) hold unhashable
+                # dicts; test their text, as the per-row checks did
+                values = values.map(str, na_action='ignore')
+            codes, uniques = pd.factorize(values)
+            hits = np.asarray(test(pd.Index(uniques).astype(str).str.lower()), dtype=bool)
+            # Missing values get code -1, which picks up the trailing False
+            return np.append(hits, False)[codes]
+        
+        committed = matches('PricingCategory', lambda values: values == 'committed')
+        
+        # First matching condition wins, mirroring the original per-row checks
+        conditions = [
+            committed & matches('CommitmentDiscountCategory', lambda values: values == 'usage'),
+            committed & matches('CommitmentDiscountCategory', lambda values: values == 'spend'),
+            matches('x_SkuDetails', lambda values: values.str.contains('ahb|hybridbenefit|hybrid benefit', regex=True)),
+            matches('SubAccountName', lambda values: values.str.contains('devtest|dev/test|dev-test', regex=True)),
+        ]
+        # Select category codes directly so the column is built as a
+        # categorical without materializing a label per row
+        codes = np.select(conditions, np.arange(len(conditions), dtype=np.int8), default=len(conditions))
+        return pd.Categorical.from_codes(codes, categories=_SAVINGS_CATEGORIES)
+    
+    def _summary(self, category: str, label: str, commitment: bool = False, discount_only: bool = False,
+                 retail_cost: Optional[float] = None) -> SavingsSummary:
+        """SavingsSummary for one SavingsCategory from the cached per-category sums"""
+        list_cost, negotiated_cost, effective_cost = self._category_costs(category)
+        retail_cost = list_cost if retail_cost is None else retail_cost
         negotiated_savings = retail_cost - negotiated_cost
+        # discount_only counts just the negotiated discount, not any effective
+        # cost adjustment below the billed cost
+        total_savings = negotiated_savings if discount_only else retail_cost - effective_cost
         
         return SavingsSummary(
-            category="Negotiated Discount",
+            category=label,
             retail_cost=retail_cost,
             negotiated_cost=negotiated_cost,
             effective_cost=effective_cost,
             negotiated_savings=negotiated_savings,
-            commitment_savings=0,
-            total_savings=negotiated_savings,
-            savings_percentage=(negotiated_savings / retail_cost * 100) if retail_cost > 0 else 0
+            commitment_savings=negotiated_cost - effective_cost if commitment else 0,
+            total_savings=total_savings,
+            savings_percentage=(total_savings / retail_cost * 100) if retail_cost > 0 else 0
         )
     
+    def calculate_negotiated_discount_savings(self) -> SavingsSummary:
+        """Calculate savings from EA/MCA negotiated discounts"""
+        # Standard pricing (not commitment-based)
+        return self._summary('Negotiated Rate', "Negotiated Discount", discount_only=True)
+    
     def calculate_ri_savings(self) -> SavingsSummary:
         """Calculate savings from Reserved Instances"""
-        df = self.costs_df[self.costs_df['SavingsCategory'] == 'Reserved Instance']
-        
-        retail_cost = df['ListCost'].sum()
-        negotiated_cost = df['BilledCost'].sum()
-        effective_cost = df['EffectiveCost'].sum()
-        negotiated_savings = retail_cost - negotiated_cost
-        commitment_savings = negotiated_cost - effective_cost
-        
-        return SavingsSummary(
-            category="Reserved Instances",
-            retail_cost=retail_cost,
-            negotiated_cost=negotiated_cost,
-            effective_cost=effective_cost,
-            negotiated_savings=negotiated_savings,
-            commitment_savings=commitment_savings,
-            total_savings=retail_cost - effective_cost,
-            savings_percentage=((retail_cost - effective_cost) / retail_cost * 100) if retail_cost > 0 else 0
-        )
+        return self._summary('Reserved Instance', "Reserved Instances", commitment=True)
     
     def calculate_savings_plan_savings(self) -> SavingsSummary:
         """Calculate savings from Savings Plans"""
-        df = self.costs_df[self.costs_df['SavingsCategory'] == 'Savings Plan']
-        
-        retail_cost = df['ListCost'].sum()
-        negotiated_cost = df['BilledCost'].sum()
-        effective_cost = df['EffectiveCost'].sum()
-        negotiated_savings = retail_cost - negotiated_cost
-        commitment_savings = negotiated_cost - effective_cost
-        
-        return SavingsSummary(
-            category="Savings Plans",
-            retail_cost=retail_cost,
-            negotiated_cost=negotiated_cost,
-            effective_cost=effective_cost,
-            negotiated_savings=negotiated_savings,
-            commitment_savings=commitment_savings,
-            total_savings=retail_cost - effective_cost,
-            savings_percentage=((retail_cost - effective_cost) / retail_cost * 100) if retail_cost > 0 else 0
-        )
+        return self._summary('Savings Plan', "Savings Plans", commitment=True)
     
     def calculate_ahb_savings(self) -> SavingsSummary:
         """Calculate savings from Azure Hybrid Benefit"""
-        df = self.costs_df[self.costs_df['SavingsCategory'] == 'Azure Hybrid Benefit']
-        
         # AHB savings are typically the difference between PAYG and AHB pricing
         # The ListCost should reflect what would have been paid without AHB
-        retail_cost = df['ListCost'].sum()
-        negotiated_cost = df['BilledCost'].sum()
-        effective_cost = df['EffectiveCost'].sum()
+        retail_cost, _, effective_cost = self._category_costs('Azure Hybrid Benefit')
         
         # AHB typically saves 40-80% on Windows/SQL licensing
         # If ListCost isn't populated, estimate based on service type
@@ -190,100 +259,58 @@ class SavingsCalculator:
             # Estimate: AHB typically saves ~40% on compute
             retail_cost = effective_cost * 1.67  # Roughly 40% savings
         
-        return SavingsSummary(
-            category="Azure Hybrid Benefit",
-            retail_cost=retail_cost,
-            negotiated_cost=negotiated_cost,
-            effective_cost=effective_cost,
-            negotiated_savings=retail_cost - negotiated_cost,
-            commitment_savings=0,
-            total_savings=retail_cost - effective_cost,
-            savings_percentage=((retail_cost - effective_cost) / retail_cost * 100) if retail_cost > 0 else 0
-        )
+        return self._summary('Azure Hybrid Benefit', "Azure Hybrid Benefit", retail_cost=retail_cost)
     
     def calculate_devtest_savings(self) -> SavingsSummary:
         """Calculate savings from Dev/Test pricing"""
-        df = self.costs_df[self.costs_df['SavingsCategory'] == 'Dev/Test Pricing']
-        
-        retail_cost = df['ListCost'].sum()
-        negotiated_cost = df['BilledCost'].sum()
-        effective_cost = df['EffectiveCost'].sum()
-        
-        return SavingsSummary(
-            category="Dev/Test Pricing",
-            retail_cost=retail_cost,
-            negotiated_cost=negotiated_cost,
-            effective_cost=effective_cost,
-            negotiated_savings=retail_cost - negotiated_cost,
-            commitment_savings=0,
-            total_savings=retail_cost - effective_cost,
-            savings_percentage=((retail_cost - effective_cost) / retail_cost * 100) if retail_cost > 0 else 0
-        )
+        return self._summary('Dev/Test Pricing', "Dev/Test Pricing")
     
     def calculate_savings_by_service(self) -> pd.DataFrame:
         """Calculate savings breakdown by service"""
-        df = self.costs_df.groupby('ServiceCategory').agg({
-            'ListCost': 'sum',
-            'BilledCost': 'sum',
-            'EffectiveCost': 'sum',
-            'NegotiatedSavings': 'sum',
-            'CommitmentSavings': 'sum',
-            'TotalSavings': 'sum'
-        }).reset_index()
+        df = _with_savings(
+            self.costs_df.groupby('ServiceCategory', observed=True, sort=False)[_COST_COLUMNS].sum().reset_index()
+        )
         
-        df['SavingsPercentage'] = (df['TotalSavings'] / df['ListCost'] * 100).round(2)
+        df['SavingsPercentage'] = _savings_percentage(df['TotalSavings'], df['ListCost'])
         df = df.sort_values('TotalSavings', ascending=False)
         
         return df
     
     def calculate_savings_by_subscription(self) -> pd.DataFrame:
         """Calculate savings breakdown by subscription"""
-        df = self.costs_df.groupby(['SubAccountId', 'SubAccountName']).agg({
-            'ListCost': 'sum',
-            'BilledCost': 'sum',
-            'EffectiveCost': 'sum',
-            'NegotiatedSavings': 'sum',
-            'CommitmentSavings': 'sum',
-            'TotalSavings': 'sum'
-        }).reset_index()
+        df = _with_savings(
+            self.costs_df.groupby(['SubAccountId', 'SubAccountName'], observed=True, sort=False)[_COST_COLUMNS].sum().reset_index()
+        )
         
-        df['SavingsPercentage'] = (df['TotalSavings'] / df['ListCost'] * 100).round(2)
+        df['SavingsPercentage'] = _savings_percentage(df['TotalSavings'], df['ListCost'])
         df = df.sort_values('TotalSavings', ascending=False)
         
         return df
     
     def calculate_monthly_trend(self) -> pd.DataFrame:
         """Calculate monthly savings trend"""
-        df = self.costs_df.copy()
-        
-        if 'ChargePeriodStart' in df.columns:
-            df['Month'] = pd.to_datetime(df['ChargePeriodStart']).dt.to_period('M')
-        else:
+        if self._months is None:
             # If no date column, return empty
             return pd.DataFrame()
         
-        monthly = df.groupby('Month').agg({
-            'ListCost': 'sum',
-            'BilledCost': 'sum',
-            'EffectiveCost': 'sum',
-            'NegotiatedSavings': 'sum',
-            'CommitmentSavings': 'sum',
-            'TotalSavings': 'sum'
-        }).reset_index()
+        # Group by the month key Series rather than adding a column to a
+        # copy of the whole frame
+        # Left sorted: the trend is reported in month order
+        monthly = _with_savings(self.costs_df.groupby(self._months)[_COST_COLUMNS].sum().reset_index())
         
-        monthly['Month'] = monthly['Month'].astype(str)
+        # Back to 'YYYY-MM' labels on the grouped frame only
+        ordinals = monthly['Month'].astype(np.int64)
+        monthly['Month'] = (ordinals // 12).astype(str) + '-' + (ordinals % 12 + 1).astype(str).str.zfill(2)
         return monthly
     
     def calculate_top_savings_resources(self, top_n: int = 20) -> pd.DataFrame:
         """Get top resources by savings amount"""
-        df = self.costs_df.groupby(['ResourceId', 'ResourceName', 'ServiceCategory', 'SavingsCategory']).agg({
-            'ListCost': 'sum',
-            'EffectiveCost': 'sum',
-            'TotalSavings': 'sum'
-        }).reset_index()
-        
-        df['SavingsPercentage'] = (df['TotalSavings'] / df['ListCost'] * 100).round(2)
-        df = df.sort_values('TotalSavings', ascending=False).head(top_n)
+        df = self.costs_df.groupby(['ResourceId', 'ResourceName', 'ServiceCategory', 'SavingsCategory'], observed=True, sort=False)[
+            ['ListCost', 'EffectiveCost']
+        ].sum().reset_index()
+        df['TotalSavings'] = df['ListCost'] - df['EffectiveCost']
+        df['SavingsPercentage'] = _savings_percentage(df['TotalSavings'], df['ListCost'])
+        df = _top_n(df, 'TotalSavings', top_n)
         
         return df
     
@@ -297,30 +324,14 @@ class SavingsCalculator:
         ahb = self.calculate_ahb_savings()
         devtest = self.calculate_devtest_savings()
         
-        # Calculate totals
-        total_retail = sum([
-            negotiated.retail_cost,
-            ri.retail_cost,
-            sp.retail_cost,
-            ahb.retail_cost,
-            devtest.retail_cost
-        ])
-        
-        total_negotiated = sum([
-            negotiated.negotiated_cost,
-            ri.negotiated_cost,
-            sp.negotiated_cost,
-            ahb.negotiated_cost,
-            devtest.negotiated_cost
-        ])
-        
-        total_effective = sum([
-            negotiated.effective_cost,
-            ri.effective_cost,
-            sp.effective_cost,
-            ahb.effective_cost,
-            devtest.effective_cost
-        ])
+        # Calculate totals; the categories partition every row, so these are
+        # the column sums of the per-category frame
+        totals = self._category_sums().sum(axis=0)
+        total_negotiated = totals['BilledCost']
+        total_effective = totals['EffectiveCost']
+        # calculate_ahb_savings may estimate retail cost when AHB rows carry
+        # no ListCost, and that estimate belongs in the total as well
+        total_retail = totals['ListCost'] - self._category_costs('Azure Hybrid Benefit')[0] + ahb.retail_cost
         
         total_savings = total_retail - total_effective
         savings_pct = (total_savings / total_retail * 100) if total_retail > 0 else 0
@@ -0,0 +1,91 @@
+"""
+Cost cache round trips: a cache hit must feed SavingsCalculator the same
+frame as the miss that wrote it
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+import pandas as pd
+
+from src.data_sources import DataSource, _categorize_columns, cached_get_costs
+from src.savings_calculator import SavingsCalculator
+
+
+START = datetime(2025, 1, 1)
+END = datetime(2025, 3, 1)
+
+
+class FakeADXSource(DataSource):
+    """Returns a frame shaped like ADXDataSource.get_costs, with nulls in the categorized columns"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def get_costs(self, start_date: datetime, end_date: datetime, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        self.calls += 1
+        df = pd.DataFrame({
+            'ChargePeriodStart': pd.to_datetime(['2025-01-01', '2025-01-02', '2025-02-03'], utc=True),
+            'SubAccountId': ['sub-1', 'sub-2', None],
+            'SubAccountName': ['DevTest', None, 'Prod'],
+            'ResourceId': ['/r/1', '/r/2', '/r/3'],
+            'ResourceName': ['vm-1', 'vm-2', None],
+            'ServiceCategory': ['Compute', None, 'Storage'],
+            'PricingCategory': ['Committed', 'Standard', None],
+            'CommitmentDiscountCategory': ['Usage', None, ''],
+            'ListCost': [10.0, None, 4.0],
+            'BilledCost': [9.0, 3.0, 4.0],
+            'EffectiveCost': [6.0, 3.0, 3.5],
+            # Kusto dynamic columns arrive as dicts mixed with strings and nulls
+            'x_SkuDetails': [{'AHB': True}, 'HybridBenefit', None],
+            'Tags': [{'env': 'prod'}, None, {'team': 'data'}],
+        })
+        return _categorize_columns(df.convert_dtypes(dtype_backend="pyarrow"))
+    
+    def get_prices(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> pd.DataFrame:
+        return pd.DataFrame()
+    
+    def test_connection(self) -> bool:
+        return True
+
+
+def _report_values(df: pd.DataFrame) -> dict:
+    report = SavingsCalculator(df).generate_report("Contoso", START, END)
+    return {
+        'totals': (report.total_retail_cost, report.total_effective_cost, report.total_savings),
+        'ri': report.reserved_instance_savings.total_savings,
+        'ahb': report.ahb_savings.effective_cost,
+        'service': report.savings_by_service.astype(str).values.tolist(),
+        'subscription': report.savings_by_subscription.astype(str).values.tolist(),
+        'monthly': report.monthly_trend.astype(str).values.tolist(),
+        'top': report.top_savings_resources.astype(str).values.tolist(),
+    }
+
+
+def test_cache_hit_returns_the_miss_frame(tmp_path):
+    source = FakeADXSource()
+    miss = cached_get_costs(source, START, END, "cfg", cache_dir=str(tmp_path))
+    hit = cached_get_costs(source, START, END, "cfg", cache_dir=str(tmp_path))
+    
+    assert source.calls == 1
+    pd.testing.assert_frame_equal(hit, miss)
+
+
+def test_calculator_reports_the_same_on_miss_and_hit(tmp_path):
+    source = FakeADXSource()
+    miss = cached_get_costs(source, START, END, "cfg", cache_dir=str(tmp_path))
+    hit = cached_get_costs(source, START, END, "cfg", cache_dir=str(tmp_path))
+    
+    assert _report_values(hit) == _report_values(miss)
+
+
+def test_calculator_accepts_arrow_dictionary_columns_with_nulls(tmp_path):
+    # A parquet cost frame read with dtype_backend="pyarrow" holds its
+    # categoricals as Arrow dictionary columns
+    source = FakeADXSource()
+    frame = source.get_costs(START, END).drop(columns=['x_SkuDetails', 'Tags'])
+    frame = frame.astype({'SubAccountId': 'category'})
+    frame.to_parquet(tmp_path / "costs.parquet")
+    arrow_frame = pd.read_parquet(tmp_path / "costs.parquet", dtype_backend="pyarrow")
+    
+    assert _report_values(arrow_frame) == _report_values(frame)